@@ -0,0 +1,133 @@
+"""
+Écritures par lots (POST /api/ratings/bulk, /api/watchlist/bulk, /api/comments/bulk)
+Chaque élément est validé par le schéma Pydantic de création existant ; les
+éléments valides dont l'utilisateur et le film existent sont écrits dans une
+seule transaction (INSERT multi-lignes, upsert pour les notes et la watchlist).
+La réponse donne un résultat par élément, dans l'ordre de la requête : un
+élément invalide n'empêche pas l'écriture des autres.
+"""
+import logging
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend.models import Movie, User
+
+logger = logging.getLogger(__name__)
+
+# Valeurs par clause IN (SQLite limite le nombre de paramètres d'une requête)
+CHUNK_SIZE = 500
+
+# Une fonction d'écriture reçoit les éléments valides et renvoie (id, créé) pour chacun, dans l'ordre
+Writer = Callable[[Session, List[Any]], List[Tuple[int, bool]]]
+
+
+def chunks(values: Sequence, size: int = CHUNK_SIZE) -> Iterator[Sequence]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def existing_ids(db: Session, column, ids) -> set:
+    """Sous-ensemble des ids présents en base (une requête par tranche)"""
+    ids = list(set(ids))
+    found = set()
+    for chunk in chunks(ids):
+        found.update(db.scalars(select(column).where(column.in_(chunk))))
+    return found
+
+
+def _result(index: int, status: str, id: Optional[int] = None, errors: Optional[List[str]] = None) -> dict:
+    return {"index": index, "status": status, "id": id, "errors": errors or []}
+
+
+def _validate(schema: Type[BaseModel], items: List[Any], results: list) -> List[Tuple[int, BaseModel]]:
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            errors = [f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}" for err in e.errors()]
+            results[index] = _result(index, "invalid", errors=errors)
+    return valid
+
+
+def _check_references(db: Session, valid: List[Tuple[int, BaseModel]], results: list) -> List[Tuple[int, BaseModel]]:
+    """Écarter les éléments dont l'utilisateur ou le film n'existe pas (SQLite n'applique pas les clés étrangères)"""
+    users = existing_ids(db, User.id, [item.user_id for _, item in valid])
+    movies = existing_ids(db, Movie.id, [item.movie_id for _, item in valid])
+    kept = []
+    for index, item in valid:
+        errors = []
+        if item.user_id not in users:
+            errors.append(f"user_id: utilisateur {item.user_id} introuvable")
+        if item.movie_id not in movies:
+            errors.append(f"movie_id: film {item.movie_id} introuvable")
+        if errors:
+            results[index] = _result(index, "not_found", errors=errors)
+        else:
+            kept.append((index, item))
+    return kept
+
+
+def _dedupe(valid: List[Tuple[int, BaseModel]], key: Callable[[Any], Hashable], results: list) -> List[Tuple[int, BaseModel]]:
+    """Un upsert ne peut viser deux fois la même ligne : le dernier élément d'une même clé l'emporte"""
+    last = {key(item): index for index, item in valid}
+    kept = []
+    for index, item in valid:
+        winner = last[key(item)]
+        if winner == index:
+            kept.append((index, item))
+        else:
+            results[index] = _result(index, "duplicate", errors=[f"remplacé par l'élément {winner} du même lot"])
+    return kept
+
+
+def write_batch(
+    db: Session,
+    schema: Type[BaseModel],
+    items: List[Any],
+    writer: Writer,
+    key: Optional[Callable[[Any], Hashable]] = None,
+    after_commit: Optional[Callable[[List[Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Valider, écrire en une transaction et rendre compte élément par élément
+
+    Args:
+        schema: schéma Pydantic de création (RatingCreate, ...)
+        writer: écriture des éléments valides, sans commit
+        key: clé d'unicité des upserts (doublons du lot écartés)
+        after_commit: appelé avec les éléments écrits, une fois la transaction validée (caches)
+
+    Returns:
+        {"created", "updated", "failed", "results": [...]} (voir schemas.BulkWriteResult)
+    """
+    results: List[Optional[dict]] = [None] * len(items)
+    valid = _validate(schema, items, results)
+    valid = _check_references(db, valid, results)
+    if key is not None:
+        valid = _dedupe(valid, key, results)
+
+    if valid:
+        try:
+            outcomes = writer(db, [item for _, item in valid])
+            db.commit()
+        except IntegrityError as e:
+            # Ligne référencée supprimée entre la vérification et l'écriture : le lot entier est annulé
+            db.rollback()
+            logger.warning("Écriture par lot annulée", extra={"items": len(valid), "error": str(e.orig)})
+            for index, _ in valid:
+                results[index] = _result(index, "failed", errors=["lot annulé : contrainte d'intégrité"])
+        else:
+            for (index, _), (row_id, created) in zip(valid, outcomes):
+                results[index] = _result(index, "created" if created else "updated", id=row_id)
+            if after_commit is not None:
+                after_commit([item for _, item in valid])
+
+    return {
+        "created": sum(1 for r in results if r["status"] == "created"),
+        "updated": sum(1 for r in results if r["status"] == "updated"),
+        "failed": sum(1 for r in results if r["status"] not in ("created", "updated")),
+        "results": results,
+    }
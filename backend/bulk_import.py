@@ -0,0 +1,193 @@
+"""
+Import en masse de films depuis une liste d'IDs IMDb
+
+    python -m backend.bulk_import ids.txt
+    python -m backend.bulk_import --ids tt0133093 tt0111161
+
+- récupération concurrente (bornée) via MovieFetcherService, débit limité par token bucket
+- écriture par lots : INSERT multi-lignes avec upsert sur imdb_id
+- point de reprise : les IDs importés sont ajoutés au fichier de checkpoint
+  après chaque lot validé ; une relance ignore les IDs déjà traités
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import func, select
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.config import get_settings
+from backend.database import SessionLocal, engine, prepare_database, dialect_insert
+from backend.models import Movie
+from backend.services.genre_service import GenreService
+from backend.services.imdb_rating_service import ImdbRatingService
+from backend.services.movie_fetcher import MovieFetcherService
+from backend.http_client import close_http_client
+
+settings = get_settings()
+
+# Colonnes mises à jour quand le film existe déjà
+UPSERT_COLUMNS = [
+    "title", "year", "poster_url", "backdrop_url", "plot", "genres",
+    "imdb_rating", "imdb_rating_fetched_at", "imdb_rating_checked_at",
+]
+
+
+def read_imdb_ids(path: str) -> List[str]:
+    """Un ID par ligne ; lignes vides et commentaires (#) ignorés"""
+    ids = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            imdb_id = line.split("#", 1)[0].strip()
+            if imdb_id:
+                ids.append(imdb_id)
+    return ids
+
+
+def load_checkpoint(path: Optional[str]) -> Set[str]:
+    if not path or not Path(path).exists():
+        return set()
+    return set(read_imdb_ids(path))
+
+
+def append_checkpoint(path: Optional[str], imdb_ids: Iterable[str]):
+    if not path:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        for imdb_id in imdb_ids:
+            f.write(f"{imdb_id}\n")
+
+
+def movie_row(movie_data: Dict) -> Dict:
+    """Données du fetcher -> ligne de la table movies"""
+    imdb_rating = ImdbRatingService.parse_rating(movie_data.get("imdb_rating"))
+    return {
+        "imdb_id": movie_data["imdb_id"],
+        "title": movie_data["title"],
+        "year": movie_data.get("year") or 2000,
+        "poster_url": movie_data.get("poster_url"),
+        "backdrop_url": movie_data.get("backdrop_url"),
+        "plot": movie_data.get("plot", ""),
+        "genres": movie_data.get("genres", ""),
+        "imdb_rating": imdb_rating,
+        "imdb_rating_fetched_at": datetime.utcnow() if imdb_rating is not None else None,
+        "imdb_rating_checked_at": datetime.utcnow(),
+    }
+
+
+def write_batch(rows: List[Dict]) -> int:
+    """Upsert d'un lot de films en une seule requête, puis réindexation de leurs genres"""
+    if not rows:
+        return 0
+    insert = dialect_insert(engine)
+    stmt = insert(Movie.__table__).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Movie.__table__.c.imdb_id],
+        set_={
+            **{col: stmt.excluded[col] for col in UPSERT_COLUMNS},
+            # Invalide les fragments HTML en cache du film
+            "version": func.coalesce(Movie.__table__.c.version, 0) + 1,
+        }
+    )
+    with SessionLocal() as db:
+        db.execute(stmt)
+        ids = db.execute(
+            select(Movie.imdb_id, Movie.id).where(Movie.imdb_id.in_([row["imdb_id"] for row in rows]))
+        )
+        id_by_imdb = {row.imdb_id: row.id for row in ids}
+        GenreService.sync(db, {id_by_imdb[row["imdb_id"]]: row["genres"] for row in rows})
+        db.commit()
+    return len(rows)
+
+
+async def import_movies(
+    imdb_ids: Iterable[str],
+    concurrency: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    checkpoint: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Importer (ou mettre à jour) les films donnés
+
+    Returns:
+        Compteurs : imported, failed, skipped
+    """
+    done = load_checkpoint(checkpoint)
+    requested = list(dict.fromkeys(imdb_ids))
+    pending = [i for i in requested if i not in done]
+    # Seuls les ids demandés et déjà traités comptent, pas tout le fichier de reprise
+    stats = {"imported": 0, "failed": 0, "skipped": len(requested) - len(pending)}
+
+    fetcher = MovieFetcherService()
+    semaphore = asyncio.Semaphore(concurrency or settings.BULK_IMPORT_CONCURRENCY)
+    batch_size = batch_size or settings.BULK_IMPORT_BATCH_SIZE
+
+    async def fetch(imdb_id: str) -> Optional[Dict]:
+        async with semaphore:
+            try:
+                return await fetcher.fetch_movie_by_imdb_id_async(imdb_id)
+            except Exception as e:
+                print(f"⚠️ Erreur import {imdb_id}: {e}")
+                return None
+
+    for start in range(0, len(pending), batch_size):
+        chunk = pending[start:start + batch_size]
+        results = await asyncio.gather(*(fetch(i) for i in chunk))
+
+        rows = [movie_row(data) for data in results if data and data.get("imdb_id")]
+        await asyncio.to_thread(write_batch, rows)
+        # Les échecs ne sont pas marqués : ils seront retentés à la prochaine reprise
+        append_checkpoint(checkpoint, [row["imdb_id"] for row in rows])
+
+        stats["imported"] += len(rows)
+        stats["failed"] += len(chunk) - len(rows)
+        print(f"📥 {start + len(chunk)}/{len(pending)} traités ({stats['imported']} importés)")
+
+    return stats
+
+
+def run_import(imdb_ids: Iterable[str], **kwargs) -> Dict[str, int]:
+    """Version synchrone de import_movies (init_db, scripts)"""
+    async def runner():
+        try:
+            return await import_movies(imdb_ids, **kwargs)
+        finally:
+            await close_http_client()
+    return asyncio.run(runner())
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Import en masse de films depuis OMDb/TMDb")
+    parser.add_argument("file", nargs="?", help="Fichier contenant un ID IMDb par ligne")
+    parser.add_argument("--ids", nargs="*", default=[], help="IDs IMDb supplémentaires")
+    parser.add_argument("--concurrency", type=int, default=settings.BULK_IMPORT_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=settings.BULK_IMPORT_BATCH_SIZE)
+    parser.add_argument("--checkpoint", help="Fichier de reprise (défaut : <file>.checkpoint)")
+    args = parser.parse_args(argv)
+
+    imdb_ids = list(args.ids)
+    if args.file:
+        imdb_ids = read_imdb_ids(args.file) + imdb_ids
+    if not imdb_ids:
+        parser.error("aucun ID IMDb fourni")
+
+    checkpoint = args.checkpoint or (f"{args.file}.checkpoint" if args.file else None)
+
+    prepare_database(engine)
+
+    stats = run_import(
+        imdb_ids,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        checkpoint=checkpoint
+    )
+    print(f"✅ Import terminé : {stats['imported']} importés, "
+          f"{stats['failed']} échecs, {stats['skipped']} déjà traités")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Cache mémoire borné (réponses des APIs externes, données par utilisateur)
+- éviction LRU au-delà de max_size
+- TTL distinct pour les réponses positives et négatives (None)
+- coalescence : des miss simultanés sur une même clé partagent un seul appel
+- compteurs hits / misses pour le suivi
+"""
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# Valeur renvoyée par get() quand la clé est absente ou expirée
+MISSING = object()
+
+
+class TTLCache:
+    """Cache LRU avec TTL positif / négatif"""
+
+    # Références faibles : le registre ne maintient pas les caches en vie
+    _registry: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+    def __init__(self, max_size: int, ttl: float, negative_ttl: Optional[float] = None, name: str = "cache"):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        TTLCache._registry.add(self)
+
+    @classmethod
+    def instances(cls) -> list:
+        """Tous les caches du processus (métriques)"""
+        return list(cls._registry)
+
+    def get(self, key: Hashable) -> Any:
+        """Valeur en cache, ou MISSING. Une valeur None est une réponse négative en cache."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            if entry[1] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Mettre en cache ; None est conservé avec le TTL négatif"""
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Retirer toutes les clés vérifiant predicate ; retourne le nombre retiré"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Lire la clé ou l'obtenir via loader() ; les appels concurrents
+        pour une même clé attendent le même appel en vol.
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is not None and future.get_loop() is loop:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                future.exception()  # évite l'avertissement si personne n'attendait
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        """Compteurs du cache"""
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+        }
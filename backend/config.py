@@ -13,11 +13,100 @@ class Settings(BaseSettings):
     # Database (SQLite pour développement local)
     DATABASE_URL: str = "sqlite:///./rapidocine.db"
     
+    # Réplicas en lecture (lectures seules des listes, recherches et moyennes)
+    DATABASE_REPLICA_URLS: list = []  # Vide : tout passe par DATABASE_URL
+    DB_READ_YOUR_WRITES_WINDOW: float = 10.0  # Secondes après une écriture où la session lit sur le primaire (> retard des réplicas)
+    
+    # Moteur de base de données (profil de production)
+    DB_ECHO: bool = False  # Journaliser chaque requête SQL (indépendant de DEBUG)
+    DB_POOL_SIZE: int = 10  # Connexions gardées ouvertes, par moteur et par processus
+    DB_MAX_OVERFLOW: int = 20  # Connexions supplémentaires temporaires en pointe
+    DB_POOL_TIMEOUT: float = 10.0  # Secondes d'attente d'une connexion libre avant erreur
+    DB_POOL_RECYCLE: int = 1800  # Secondes avant de renouveler une connexion (coupures réseau, proxys)
+    DB_POOL_PRE_PING: bool = True  # Vérifier la connexion au checkout
+    DB_STATEMENT_TIMEOUT_MS: int = 15000  # statement_timeout PostgreSQL ; 0 = désactivé
+    DB_PGBOUNCER: bool = False  # Derrière PgBouncer (mode transaction) : pas de pool applicatif ni de requêtes préparées
+    SQLITE_WAL: bool = True  # journal_mode=WAL + synchronous=NORMAL (fichiers SQLite)
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Attente d'un verrou d'écriture avant "database is locked"
+    
     # CORS
     CORS_ORIGINS: list = ["http://localhost", "http://localhost:8000", "http://localhost:80", "http://127.0.0.1", "*"]
     
     # OMDb API
     OMDB_API_KEY: str = "1ba53e51"  # Obtenez votre clé gratuite sur http://www.omdbapi.com/apikey.aspx
+    OMDB_BASE_URL: str = "http://www.omdbapi.com/"
+    OMDB_RATE_LIMIT: float = 10.0  # Requêtes par seconde (token bucket)
+    OMDB_RATE_BURST: float = 10.0  # Rafale maximale
+    
+    # TMDb API (images HD)
+    TMDB_BASE_URL: str = "https://api.themoviedb.org/3"
+    TMDB_RATE_LIMIT: float = 20.0
+    TMDB_RATE_BURST: float = 20.0
+    
+    # Enrichissement IMDb des listes de films
+    IMDB_ENRICH_CONCURRENCY: int = 10  # Requêtes OMDb simultanées maximum
+    IMDB_RATING_TTL_HOURS: int = 24  # Durée de validité d'une note stockée en base
+    IMDB_RATING_NEGATIVE_TTL_HOURS: float = 6  # Délai avant de redemander une note absente ("N/A", échec)
+    IMDB_REFRESH_ENABLED: bool = True  # Tâche de fond de rafraîchissement des notes
+    IMDB_REFRESH_INTERVAL: float = 300.0  # Secondes entre deux passes
+    IMDB_REFRESH_BATCH: int = 100  # Films rafraîchis par passe
+    
+    # Client HTTP partagé (OMDb / TMDb)
+    HTTP_TIMEOUT: float = 10.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Secondes avant fermeture d'une connexion inactive
+    HTTP2_ENABLED: bool = True  # Utilisé seulement si le paquet h2 est installé
+    
+    # Cache mémoire des réponses OMDb / TMDb
+    EXTERNAL_CACHE_MAX_SIZE: int = 10000  # Entrées par cache (éviction LRU)
+    EXTERNAL_CACHE_TTL: float = 6 * 3600  # Secondes, réponses valides
+    EXTERNAL_CACHE_NEGATIVE_TTL: float = 15 * 60  # Secondes, échecs et "N/A"
+    SEARCH_CACHE_TTL: float = 10 * 60  # Secondes, résultats d'auto-complétion
+    
+    # Mots de passe (bcrypt) : pool de threads dédié
+    BCRYPT_ROUNDS: int = 12  # Coût ; les hashes plus faibles sont recalculés à la connexion
+    PASSWORD_HASH_WORKERS: int = 4  # Hachages simultanés maximum
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Au-delà : 503 plutôt qu'une file sans fin
+    
+    # Cache des IDs de films en watchlist par utilisateur (pages HTML)
+    WATCHLIST_CACHE_TTL: float = 30.0  # Secondes ; invalidé à chaque écriture de ce processus
+    WATCHLIST_CACHE_MAX_SIZE: int = 10000  # Utilisateurs en cache
+    
+    # Cache des fragments HTML (cartes de film, en-tête de fiche)
+    FRAGMENT_CACHE_MAX_SIZE: int = 20000
+    FRAGMENT_CACHE_TTL: float = 3600.0  # Secondes ; la clé inclut déjà la version du film
+    
+    # Cache HTTP (Cache-Control max-age, en secondes ; revalidation par ETag ensuite)
+    HTTP_CACHE_API_MAX_AGE: int = 60  # /api/movies
+    HTTP_CACHE_IMDB_MAX_AGE: int = 3600  # /api/movies/{id}/imdb
+    HTTP_CACHE_PAGE_MAX_AGE: int = 30  # Pages HTML anonymes
+    
+    # Écritures par lots (POST /api/ratings/bulk, /api/watchlist/bulk, /api/comments/bulk)
+    BULK_WRITE_MAX_ITEMS: int = 5000  # Éléments par requête ; au-delà : 422
+    
+    # Navigation à facettes (/api/movies/browse, page /movies)
+    BROWSE_FACETS_CACHE_TTL: float = 60.0  # Secondes ; comptes par combinaison de filtres
+    BROWSE_FACETS_CACHE_MAX_SIZE: int = 2000
+    
+    # Pagination par curseur des pages HTML
+    MOVIES_PAGE_SIZE: int = 100  # Films par page (/movies, watchlist)
+    COMMENTS_PAGE_SIZE: int = 20  # Commentaires par page (/movie/{id})
+    
+    # Index d'auto-complétion en mémoire
+    AUTOCOMPLETE_REBUILD_INTERVAL: float = 600.0  # Secondes entre deux reconstructions complètes
+    
+    # Import en masse du catalogue (python -m backend.bulk_import)
+    BULK_IMPORT_CONCURRENCY: int = 8  # Films récupérés en parallèle
+    BULK_IMPORT_BATCH_SIZE: int = 200  # Lignes par INSERT multi-lignes
+    
+    # Observabilité (métriques Prometheus sur /metrics, logs structurés)
+    METRICS_ENABLED: bool = True
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True  # Une ligne JSON par événement ; False : texte lisible
+    LOG_SAMPLE_RATE: float = 1.0  # Part des logs DEBUG / INFO conservés (WARNING+ toujours)
+    SLOW_REQUEST_SECONDS: float = 1.0  # Au-delà : log WARNING avec le détail SQL / API / gabarit
     
     class Config:
         env_file = ".env"
@@ -1,20 +1,79 @@
-from sqlalchemy import create_engine
+import itertools
+import time
+from fastapi import Request
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateColumn
 from .config import get_settings
+from .db_pool import engine_options, configure_engine
 
 settings = get_settings()
 
-# Création du moteur de base de données
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
+# Création du moteur de base de données (pool et pragmas : voir db_pool)
+engine = configure_engine(
+    create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, "sync")),
+    "sync"
 )
 
 # Session locale
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Pilotes asynchrones correspondant aux pilotes synchrones
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL synchrone -> URL du pilote asynchrone (aiosqlite, asyncpg)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Pas de pilote asynchrone connu pour {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# Moteur asynchrone, à côté du moteur synchrone (scripts, routers sync, tâches de fond)
+ASYNC_DATABASE_URL = async_database_url(settings.DATABASE_URL)
+async_engine = configure_engine(
+    create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, "async", is_async=True)),
+    "async"
+)
+
+# expire_on_commit=False : les objets restent lisibles après commit sans recharger
+# (un rechargement implicite hors await est impossible en asynchrone)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Réplicas en lecture seule (optionnels) : un moteur synchrone et un asynchrone par URL
+replica_engines = [
+    configure_engine(create_engine(url, **engine_options(url, f"replica{i}")), f"replica{i}")
+    for i, url in enumerate(settings.DATABASE_REPLICA_URLS, start=1)
+]
+async_replica_engines = [
+    configure_engine(
+        create_async_engine(async_database_url(url), **engine_options(async_database_url(url), f"async_replica{i}", is_async=True)),
+        f"async_replica{i}"
+    )
+    for i, url in enumerate(settings.DATABASE_REPLICA_URLS, start=1)
+]
+ReplicaSessionLocals = [
+    sessionmaker(autocommit=False, autoflush=False, bind=replica) for replica in replica_engines
+]
+AsyncReplicaSessionLocals = [
+    async_sessionmaker(replica, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    for replica in async_replica_engines
+]
+_replica_turn = itertools.count()
+
+# Horodatage de la dernière écriture, dans la session (cookie) du navigateur
+LAST_WRITE_SESSION_KEY = "db_last_write"
+
 # Base pour les modèles
 Base = declarative_base()
 
@@ -26,3 +85,94 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency pour les handlers async : les requêtes SQL ne bloquent pas la boucle.
+# Les services synchrones s'y exécutent via `await db.run_sync(Service.methode, ...)`.
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def mark_write(request: Request):
+    """
+    Noter une écriture faite pour cette session : ses lectures restent sur le
+    primaire pendant DB_READ_YOUR_WRITES_WINDOW, le temps que les réplicas rattrapent
+    """
+    if replica_engines:
+        request.session[LAST_WRITE_SESSION_KEY] = time.time()
+
+
+def reads_from_primary(request: Request) -> bool:
+    """La session a-t-elle écrit trop récemment pour lire sur un réplica ?"""
+    last_write = request.session.get(LAST_WRITE_SESSION_KEY)
+    return last_write is not None and time.time() - last_write < settings.DB_READ_YOUR_WRITES_WINDOW
+
+
+def _read_factory(request: Request, primary, replicas):
+    if not replicas or reads_from_primary(request):
+        return primary
+    # Tourniquet entre les réplicas
+    return replicas[next(_replica_turn) % len(replicas)]
+
+
+# Dependency pour les lectures seules (listes, recherche, moyennes) : réplica si configuré
+def get_read_db(request: Request):
+    db = _read_factory(request, SessionLocal, ReplicaSessionLocals)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    async with _read_factory(request, AsyncSessionLocal, AsyncReplicaSessionLocals)() as db:
+        yield db
+
+
+def prepare_database(bind=engine):
+    """Créer / mettre à niveau le schéma et les index spécifiques au dialecte"""
+    from backend.services.search_service import SearchService
+    from backend.services.rating_stats_service import RatingStatsService
+    from backend.services.genre_service import GenreService
+
+    Base.metadata.create_all(bind=bind)
+    upgrade_schema(bind)
+    SearchService.ensure_index(bind)
+    RatingStatsService.ensure_triggers(bind)
+    GenreService.ensure_index(bind)
+
+
+def upgrade_schema(bind=engine):
+    """
+    Ajoute aux tables existantes les colonnes (nullables) et index manquants.
+
+    create_all ne crée que les tables absentes : sans cette étape, une base
+    créée avec une version précédente des modèles ne verrait pas les nouvelles colonnes.
+    """
+    inspector = inspect(bind)
+    preparer = bind.dialect.identifier_preparer
+    existing_tables = set(inspector.get_table_names())
+
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns and column.nullable:
+                    column_ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                    conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}"))
+
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+
+
+def dialect_insert(bind):
+    """insert() propre au dialecte (PostgreSQL / SQLite), qui supporte ON CONFLICT"""
+    if bind.dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
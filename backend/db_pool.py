@@ -0,0 +1,187 @@
+"""
+Profil du moteur de base de données
+Options de pool (taille, débordement, recyclage, délai d'attente), délai maximal
+des requêtes PostgreSQL, pragmas SQLite (WAL) et mode PgBouncer. Les pools
+mesurent l'attente au checkout : un pool saturé se voit dans les statistiques
+avant de se voir dans les temps de réponse.
+"""
+import logging
+import threading
+import time
+from uuid import uuid4
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from backend.config import get_settings
+
+settings = get_settings()
+
+
+class PoolMonitor:
+    """Compteurs de checkout par pool (attente, délais dépassés), lus par stats()"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines = {}
+        self._counters = {}
+
+    def register(self, name: str, engine):
+        # On garde le moteur et non le pool : dispose() remplace le pool
+        with self._lock:
+            self._engines[name] = engine
+            self._counters.setdefault(name, self._new_counters())
+
+    @staticmethod
+    def _new_counters() -> dict:
+        return {"checkouts": 0, "timeouts": 0, "waiting": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+
+    def _get(self, name: str) -> dict:
+        return self._counters.setdefault(name, self._new_counters())
+
+    def wait_started(self, name: str):
+        with self._lock:
+            self._get(name)["waiting"] += 1
+
+    def wait_finished(self, name: str, elapsed: float, timed_out: bool):
+        with self._lock:
+            counters = self._get(name)
+            counters["waiting"] -= 1
+            if timed_out:
+                counters["timeouts"] += 1
+                return
+            counters["checkouts"] += 1
+            counters["wait_seconds_total"] += elapsed
+            counters["wait_seconds_max"] = max(counters["wait_seconds_max"], elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            engines = dict(self._engines)
+            counters = {name: dict(values) for name, values in self._counters.items()}
+
+        result = {}
+        for name, engine in engines.items():
+            pool = engine.pool
+            entry = {"pool": type(pool).__name__, **counters.get(name, self._new_counters())}
+            entry["wait_seconds_total"] = round(entry["wait_seconds_total"], 6)
+            entry["wait_seconds_max"] = round(entry["wait_seconds_max"], 6)
+            if isinstance(pool, QueuePool):
+                in_use = pool.checkedout()
+                # Valeur passée par engine_options (max_overflow=settings.DB_MAX_OVERFLOW)
+                max_overflow = settings.DB_MAX_OVERFLOW
+                capacity = pool.size() + max_overflow if max_overflow >= 0 else None
+                entry.update({
+                    "size": pool.size(),
+                    "max_overflow": max_overflow,
+                    "in_use": in_use,
+                    "idle": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                    "saturation": round(in_use / capacity, 3) if capacity else None,
+                })
+            result[name] = entry
+        return result
+
+
+pool_monitor = PoolMonitor()
+
+
+def pool_label(pool) -> str:
+    """Libellé d'un pool : le nom donné par engine_options (paramètre public logging_name)"""
+    return pool.logging_name or "default"
+
+
+class _MonitoredPoolMixin:
+    """Chronométrer l'obtention d'une connexion (y compris l'attente d'une place libre)"""
+
+    def _do_get(self):
+        name = pool_label(self)
+        pool_monitor.wait_started(name)
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_monitor.wait_finished(name, time.perf_counter() - started, timed_out)
+
+
+class MonitoredQueuePool(_MonitoredPoolMixin, QueuePool):
+    pass
+
+
+class MonitoredAsyncQueuePool(_MonitoredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# Le journal interne d'un pool SQLAlchemy est nommé d'après sa classe (ici backend.db_pool.*) :
+# garder le niveau des pools standard (sqlalchemy.pool), pas celui des loggers backend
+for _pool_class in (MonitoredQueuePool, MonitoredAsyncQueuePool):
+    logging.getLogger(f"{__name__}.{_pool_class.__name__}").setLevel(logging.WARNING)
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(url: str, name: str, is_async: bool = False) -> dict:
+    """Arguments de create_engine / create_async_engine selon la configuration"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    # pool_logging_name : libellé du pool (statistiques, métriques), conservé par dispose()
+    options = {"echo": settings.DB_ECHO, "pool_pre_ping": settings.DB_POOL_PRE_PING, "pool_logging_name": name}
+
+    # SQLite en mémoire : pool propre au dialecte (une seule connexion partagée)
+    if _is_memory_sqlite(parsed):
+        return options
+
+    if backend == "postgresql" and settings.DB_PGBOUNCER:
+        # PgBouncer (mode transaction) mutualise déjà les connexions : pas de second pool,
+        # pas de paramètres de démarrage (statement_timeout se règle par ALTER ROLE),
+        # et pas de requêtes préparées nommées qui survivraient à la transaction.
+        options.update(poolclass=NullPool, pool_pre_ping=False)
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    options.update(
+        poolclass=MonitoredAsyncQueuePool if is_async else MonitoredQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def configure_engine(engine, name: str):
+    """Pragmas SQLite à chaque connexion et enregistrement du pool pour les statistiques"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    url = sync_engine.url
+
+    if url.get_backend_name() == "sqlite":
+        wal = settings.SQLITE_WAL and not _is_memory_sqlite(url)
+
+        @event.listens_for(sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            # WAL : les lectures ne bloquent plus pendant une écriture
+            if wal:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.close()
+
+    pool_monitor.register(name, sync_engine)
+    return engine
@@ -0,0 +1,70 @@
+"""
+Cache des fragments HTML rendus (cartes de film, en-tête de la fiche film)
+Clé : (gabarit, id du film, version, options d'affichage). La version du film est
+incrémentée à chaque modification : une nouvelle version donne une nouvelle clé
+et l'ancienne sort du cache par LRU. Les éléments propres à l'utilisateur (cœur
+watchlist) ne sont pas mis en cache : ils remplacent un marqueur après coup.
+"""
+from markupsafe import Markup
+from backend.cache import TTLCache, MISSING
+from backend.config import get_settings
+
+settings = get_settings()
+
+fragment_cache = TTLCache(
+    max_size=settings.FRAGMENT_CACHE_MAX_SIZE,
+    ttl=settings.FRAGMENT_CACHE_TTL,
+    name="fragments"
+)
+
+HEART_SLOT = "<!--heart-->"
+
+CARD_HEART = (
+    '<div class="wishlist-heart{active}" data-movie-id="{movie_id}">'
+    '<i class="{icon} fa-heart"></i></div>'
+)
+DETAIL_HEART = (
+    '<span class="wishlist-heart{active}" data-movie-id="{movie_id}" '
+    'style="position: static; display:inline-flex; margin-left:10px; vertical-align: middle;">'
+    '<i class="{icon} fa-heart"></i></span>'
+)
+
+
+def _heart(template: str, movie_id: int, in_watchlist: bool) -> str:
+    return template.format(
+        active=" active" if in_watchlist else "",
+        movie_id=movie_id,
+        icon="fas" if in_watchlist else "far",
+    )
+
+
+def render_fragment(env, template_name: str, movie, **options) -> str:
+    """HTML du gabarit pour ce film, rendu une fois par version du film"""
+    key = (template_name, movie.id, movie.version, tuple(sorted(options.items())))
+    html = fragment_cache.get(key)
+    if html is MISSING:
+        html = env.get_template(template_name).render(movie=movie, **options)
+        fragment_cache.set(key, html)
+    return html
+
+
+def invalidate_movie(movie_id: int):
+    """Retirer les fragments d'un film supprimé (les versions périmées partent par LRU)"""
+    # Indispensable : SQLite peut réattribuer l'id d'un film supprimé (version 1 à nouveau)
+    fragment_cache.invalidate_where(lambda key: key[1] == movie_id)
+
+
+def install(templates):
+    """Exposer les helpers de fragments aux gabarits Jinja"""
+    env = templates.env
+
+    def movie_card(movie, show_imdb_rating=False, in_watchlist=False):
+        html = render_fragment(env, "partials/movie_card.html", movie, show_imdb_rating=bool(show_imdb_rating))
+        return Markup(html.replace(HEART_SLOT, _heart(CARD_HEART, movie.id, in_watchlist)))
+
+    def movie_detail_header(movie, in_watchlist=False):
+        html = render_fragment(env, "partials/movie_detail_header.html", movie)
+        return Markup(html.replace(HEART_SLOT, _heart(DETAIL_HEART, movie.id, in_watchlist)))
+
+    env.globals["movie_card"] = movie_card
+    env.globals["movie_detail_header"] = movie_detail_header
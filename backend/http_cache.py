@@ -0,0 +1,107 @@
+"""
+Cache HTTP : ETag, Last-Modified, Cache-Control et réponses 304
+Les validateurs sont calculés à partir de données peu coûteuses (version des
+lignes, ids) avant le rendu : une requête conditionnelle satisfaite évite la
+sérialisation ou le gabarit, et parfois les requêtes SQL du corps.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from backend.config import get_settings
+
+settings = get_settings()
+
+API_CACHE_CONTROL = f"public, max-age={settings.HTTP_CACHE_API_MAX_AGE}"
+IMDB_CACHE_CONTROL = f"public, max-age={settings.HTTP_CACHE_IMDB_MAX_AGE}"
+# Pages anonymes : partageables par nginx / le navigateur, revalidées rapidement
+PUBLIC_PAGE_CACHE_CONTROL = f"public, max-age={settings.HTTP_CACHE_PAGE_MAX_AGE}"
+# Pages connectées : contenu propre à l'utilisateur (cœurs, notes)
+PRIVATE_PAGE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """ETag fort (entre guillemets) dérivé des parties données"""
+    digest = hashlib.sha1(repr((settings.APP_VERSION,) + parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Le client possède-t-il déjà cette version ? (If-None-Match prime sur If-Modified-Since)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Comparaison faible (RFC 9110) : un proxy peut avoir ajouté W/
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def cache_headers(etag: str, cache_control: str, last_modified: Optional[datetime] = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
+
+
+def not_modified_response(
+    request: Request,
+    etag: str,
+    cache_control: str,
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """Réponse 304 si la requête conditionnelle est satisfaite, sinon None"""
+    if request.method in ("GET", "HEAD") and is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=cache_headers(etag, cache_control, last_modified))
+    return None
+
+
+def set_cache_headers(
+    response: Response,
+    etag: str,
+    cache_control: str,
+    last_modified: Optional[datetime] = None
+) -> Response:
+    response.headers.update(cache_headers(etag, cache_control, last_modified))
+    return response
+
+
+def is_anonymous(request: Request) -> bool:
+    return not request.session.get("user_id")
+
+
+def page_not_modified(request: Request, *etag_parts) -> Optional[Response]:
+    """304 pour une page HTML anonyme déjà en cache chez le client (les pages connectées ne sont pas validées)"""
+    if not is_anonymous(request):
+        return None
+    response = not_modified_response(request, make_etag(*etag_parts), PUBLIC_PAGE_CACHE_CONTROL)
+    if response is not None:
+        response.headers["Vary"] = "Cookie"
+    return response
+
+
+def set_page_cache_headers(request: Request, response: Response, *etag_parts) -> Response:
+    """En-têtes de cache d'une page HTML : publique et validée par ETag si anonyme, privée sinon"""
+    response.headers["Vary"] = "Cookie"
+    if is_anonymous(request):
+        return set_cache_headers(response, make_etag(*etag_parts), PUBLIC_PAGE_CACHE_CONTROL)
+    response.headers["Cache-Control"] = PRIVATE_PAGE_CACHE_CONTROL
+    return response
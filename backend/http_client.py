@@ -0,0 +1,55 @@
+"""
+Client HTTP partagé pour les APIs externes (OMDb, TMDb)
+Un seul pool de connexions par boucle d'événements : keep-alive, HTTP/2 si le
+paquet `h2` est installé, limites configurables dans Settings.
+"""
+import asyncio
+import importlib.util
+import weakref
+import httpx
+from .config import get_settings
+from .metrics import HTTPX_EVENT_HOOKS
+
+settings = get_settings()
+
+# HTTP/2 nécessite l'extra httpx[http2]
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Un client par boucle : les connexions httpx sont liées à la boucle qui les a ouvertes.
+# En pratique il n'y en a qu'une (celle d'uvicorn) ; les scripts via asyncio.run en créent une temporaire.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _client_options() -> dict:
+    return {
+        "timeout": httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "http2": settings.HTTP2_ENABLED and HTTP2_AVAILABLE,
+        "event_hooks": HTTPX_EVENT_HOOKS if settings.METRICS_ENABLED else {},
+    }
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Client partagé de la boucle courante (créé à la demande)"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**_client_options())
+        _clients[loop] = client
+    return client
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Créer le client partagé (appelé au démarrage de l'application)"""
+    return get_http_client()
+
+
+async def close_http_client():
+    """Fermer le client de la boucle courante (arrêt de l'application, fin de script)"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
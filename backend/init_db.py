@@ -5,17 +5,17 @@ from pathlib import Path
 # Ajouter le répertoire parent au path pour les imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from backend.database import SessionLocal, engine, Base
+from backend.database import SessionLocal, engine, prepare_database
 from backend.models import User, Movie, Rating, Comment, Watchlist
-from backend.services import UserService
-from backend.services.movie_fetcher import MovieFetcherService  # Import correct
+from backend.services import UserService, GenreService
+from backend.bulk_import import run_import
 
 
 def init_db():
     """Initialiser la base de données avec des données de test"""
     
     # Créer les tables
-    Base.metadata.create_all(bind=engine)
+    prepare_database(engine)
     
     # Créer une session
     db = SessionLocal()
@@ -120,32 +120,10 @@ def init_db():
             "tt0758758",
         ]
         
-        # CRÉER L'INSTANCE DU FETCHER
-        movie_fetcher = MovieFetcherService()
-        
-        movies = []
-        for imdb_id in imdb_ids:
-            try:
-                # APPEL CORRECT : utiliser l'instance
-                movie_data = movie_fetcher.fetch_movie_by_imdb_id(imdb_id)
-                if movie_data:
-                    # Utiliser l'année déjà extraite par le fetcher
-                    year = movie_data.get("year")
-                    
-                    movie = Movie(
-                        imdb_id=movie_data["imdb_id"],
-                        title=movie_data["title"],
-                        year=year if year else 2000,
-                        poster_url=movie_data.get("poster_url"),
-                        backdrop_url=movie_data.get("backdrop_url"),  # NOUVEAU!
-                        plot=movie_data.get("plot", ""),
-                        genres=movie_data.get("genres", "")
-                    )
-                    db.add(movie)
-                    movies.append(movie)
-            except Exception as e:
-                import traceback
-                traceback.print_exc()
+        # Récupération concurrente + INSERT par lots (voir backend/bulk_import.py)
+        stats = run_import(imdb_ids)
+        print(f"   {stats['imported']} films importés, {stats['failed']} échecs")
+        movies = db.query(Movie).all()
         
         # Si aucun film n'a pu être récupéré depuis les APIs
         if not movies:
@@ -175,6 +153,8 @@ def init_db():
             
             for movie in movies_fallback:
                 db.add(movie)
+            db.flush()
+            GenreService.sync(db, {movie.id: movie.genres for movie in movies_fallback})
             movies = movies_fallback
         
         db.commit()
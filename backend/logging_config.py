@@ -0,0 +1,74 @@
+"""
+Journalisation structurée
+Une ligne JSON par événement (ou texte lisible si LOG_JSON=False). Les champs
+passés dans `extra` deviennent des clés du JSON. Les niveaux DEBUG / INFO sont
+échantillonnés (LOG_SAMPLE_RATE, ou `extra={"sample_rate": ...}` par appel) ;
+WARNING et au-delà sont toujours écrits.
+"""
+import json
+import logging
+import random
+import sys
+from datetime import datetime, timezone
+from backend.config import get_settings
+
+settings = get_settings()
+
+# Attributs standard d'un LogRecord : tout le reste vient de `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "sample_rate"}
+
+
+class SamplingFilter(logging.Filter):
+    """Écarter une fraction des messages sous WARNING"""
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = getattr(record, "sample_rate", self.sample_rate)
+        return rate >= 1 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(
+            f"{key}={value}" for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES
+        )
+        return f"{line} {extras}" if extras else line
+
+
+def configure_logging():
+    """Installer le handler des loggers `backend.*` (idempotent)"""
+    logger = logging.getLogger("backend")
+    if getattr(logger, "_rapidocine_configured", False):
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    if settings.LOG_JSON:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATE))
+    logger.addHandler(handler)
+    logger.setLevel(settings.LOG_LEVEL.upper())
+    logger.propagate = False
+    logger._rapidocine_configured = True
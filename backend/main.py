@@ -1,34 +1,72 @@
-from fastapi import FastAPI, Request, HTTPException, Depends, Form
+from fastapi import FastAPI, Request, HTTPException, Depends, Form, Query
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse
+from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from typing import Optional
-from sqlalchemy.orm import Session, aliased
-from sqlalchemy import func, desc, case, cast, Integer
+from contextlib import asynccontextmanager
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, case, cast, Integer, select
+from sqlalchemy.exc import IntegrityError
 from backend.config import get_settings
-from backend.database import engine, Base, get_db
+from backend.database import (
+    engine, async_engine, async_replica_engines, get_async_db, get_async_read_db, mark_write, prepare_database
+)
+from backend.http_client import start_http_client, close_http_client
+from backend.pagination import InvalidCursor, NEXT_CURSOR_HEADER, paginate
+from backend import fragments, metrics
+from backend.logging_config import configure_logging
+from backend.password_hasher import PasswordHasherBusy
+from backend.http_cache import (
+    IMDB_CACHE_CONTROL, make_etag, not_modified_response, set_cache_headers,
+    page_not_modified, set_page_cache_headers
+)
 from backend.routers import users_router, movies_router, ratings_router, comments_router, watchlist_router
-from backend.services import MovieService, UserService
+from backend.services import BrowseService, MovieService, RankingService, UserService, WatchlistService
+from backend.services.browse_service import SORT_LABELS
+from backend.services.genre_service import genre_slug
 from backend.services.rating_service import RatingService
+from backend.services.imdb_rating_service import ImdbRatingService
+from backend.services.autocomplete_index import autocomplete_index
+import asyncio
+import logging
 import random
 from pathlib import Path  # <-- ajout
-import httpx  # <-- ajout pour les requêtes HTTP
 import os
 from dotenv import load_dotenv
 
 load_dotenv()  # Charger les variables d'environnement
 
-# DEBUG TEMPORAIRE
-print(f" OMDB_API_KEY loaded: {os.getenv('OMDB_API_KEY', 'NOT FOUND')}")
+configure_logging()
+logger = logging.getLogger(__name__)
+logger.debug("Configuration chargée", extra={"omdb_api_key": "définie" if os.getenv("OMDB_API_KEY") else "absente"})
 
 # Créer les tables
-Base.metadata.create_all(bind=engine)
+prepare_database(engine)
 
 # Configuration
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Démarrage / arrêt : pool de connexions HTTP partagé, index d'auto-complétion, rafraîchissement des notes IMDb"""
+    await start_http_client()
+    await asyncio.to_thread(autocomplete_index.build_from_db)
+    tasks = [asyncio.create_task(autocomplete_index.run_rebuilder())]
+    if settings.IMDB_REFRESH_ENABLED:
+        tasks.append(asyncio.create_task(ImdbRatingService.run_refresher()))
+    yield
+    for task in tasks:
+        task.cancel()
+    await close_http_client()
+    await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
+
+
 # Initialisation de l'application
 app = FastAPI(
     title="RapidoCine - Integrated",
@@ -36,7 +74,8 @@ app = FastAPI(
     description="IMDB Clone with full features",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    lifespan=lifespan
 )
 
 # Configuration Sessions (AVANT CORS pour priorité)
@@ -56,8 +95,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Métriques : ajouté en dernier, donc middleware le plus externe (mesure toute la pile)
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.instrument_engines()
+    metrics.install_collectors()
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # Rafale de connexions : refuser vite plutôt que de laisser la file grossir
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporairement surchargé, réessayez"},
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": "Curseur de pagination invalide"})
+
 # Mount static files for frontend (chemins ABSOLUS, robustes)
 BASE_DIR = Path(__file__).resolve().parents[1]
 STATIC_DIR = BASE_DIR / "frontend" / "static"
@@ -65,6 +126,9 @@ TEMPLATES_DIR = BASE_DIR / "frontend" / "templates"
 
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+if settings.METRICS_ENABLED:
+    metrics.instrument_templates(templates)
+fragments.install(templates)  # movie_card(), movie_detail_header() : fragments HTML en cache
 
 # Include API routers
 app.include_router(users_router, prefix="/api")
@@ -76,23 +140,8 @@ app.include_router(watchlist_router, prefix="/api")
 
 # ========== FRONTEND ROUTES ==========
 
-async def enrich_movies_with_imdb(movies: list) -> list:
-    """Enrichit les films avec leur note IMDb et les trie par note décroissante."""
-    enriched = []
-    for movie in movies:
-        imdb_rating = None
-        if movie.imdb_id:
-            imdb_rating = await fetch_imdb_rating(movie.imdb_id)
-        setattr(movie, 'imdb_rating_5', round(imdb_rating / 2, 1) if imdb_rating else None)
-        setattr(movie, 'imdb_rating_10', imdb_rating)
-        enriched.append(movie)
-    
-    # Trier par note IMDb décroissante (les films sans note à la fin)
-    enriched.sort(key=lambda m: (m.imdb_rating_10 is None, -(m.imdb_rating_10 or 0)))
-    return enriched
-
 @app.get("/", response_class=HTMLResponse)
-async def home(request: Request, db: Session = Depends(get_db)):
+async def home(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """Serves the main index.html page with a featured movie."""
     current_user = None
     if request.session.get("user_id"):
@@ -101,19 +150,23 @@ async def home(request: Request, db: Session = Depends(get_db)):
             "username": request.session["username"]
         }
     
-    all_movies = MovieService.get_all(db)
+    all_movies = await db.run_sync(MovieService.get_all)
+    
+    etag_parts = ("home", [(m.id, m.version) for m in all_movies])
+    not_modified = page_not_modified(request, *etag_parts)
+    if not_modified:
+        return not_modified
     
     # Sélectionner quelques films populaires avec poster pour le carrousel
     popular_movies = [m for m in all_movies if m.plot and m.poster_url]
     featured_movies = popular_movies
 
     # Préparer la wishlist de l'utilisateur connecté
-    watchlist_ids = []
+    watchlist_ids = frozenset()
     if current_user:
-        from backend.models import Watchlist
-        watchlist_ids = [row[0] for row in db.query(Watchlist.movie_id).filter(Watchlist.user_id == current_user["id"]).all()]
+        watchlist_ids = await db.run_sync(WatchlistService.get_movie_ids, current_user["id"])
 
-    return templates.TemplateResponse("index.html", {
+    response = templates.TemplateResponse("index.html", {
         "request": request,
         "current_user": current_user,
         "movies": all_movies,
@@ -122,6 +175,7 @@ async def home(request: Request, db: Session = Depends(get_db)):
         "watchlist_ids": watchlist_ids,
         "api_url": "/api"
     })
+    return set_page_cache_headers(request, response, *etag_parts)
 
 
 # ========== AUTHENTICATION ROUTES ==========
@@ -142,15 +196,12 @@ async def login(
     request: Request,
     username: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Traiter la connexion"""
-    from backend.models import User
-    
-    # Récupérer l'utilisateur
-    user = db.query(User).filter(User.username == username).first()
-    
-    if not user or not UserService.verify_password(password, user.password_hash):
+    # Vérification bcrypt dans le pool dédié (et re-hash si le coût a changé)
+    user = await UserService.authenticate_async(db, username, password)
+    if not user:
         return RedirectResponse("/login?error=invalid", status_code=302)
     
     # Créer la session
@@ -177,18 +228,18 @@ async def register(
     username: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Traiter l'inscription"""
     from backend.models import User
     
     # Vérifier si username existe déjà
-    existing_user = db.query(User).filter(User.username == username).first()
+    existing_user = await db.run_sync(UserService.get_by_username, username)
     if existing_user:
         return RedirectResponse("/register?error=username_exists", status_code=302)
     
     # Vérifier si email existe déjà
-    existing_email = db.query(User).filter(User.email == email).first()
+    existing_email = await db.run_sync(UserService.get_by_email, email)
     if existing_email:
         return RedirectResponse("/register?error=email_exists", status_code=302)
     
@@ -196,11 +247,11 @@ async def register(
     new_user = User(
         username=username,
         email=email,
-        password_hash=UserService.hash_password(password)
+        password_hash=await UserService.hash_password_async(password)
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Créer la session automatiquement
     request.session["user_id"] = new_user.id
@@ -216,8 +267,16 @@ async def logout(request: Request):
 
 
 @app.get("/movies", response_class=HTMLResponse)
-async def all_movies_page(request: Request, db: Session = Depends(get_db)):
-    """Page showing all movies sorted by IMDb rating."""
+async def all_movies_page(
+    request: Request,
+    cursor: Optional[str] = None,
+    genre: Optional[str] = None,
+    year: Optional[int] = None,
+    min_rating: Optional[float] = Query(None, ge=0, le=10),
+    sort: str = Query("imdb_rating", pattern="^(imdb_rating|community|year|recent)$"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Catalogue filtré côté serveur (genre, année, note IMDb) avec comptes par facette."""
     current_user = None
     if request.session.get("user_id"):
         current_user = {
@@ -225,29 +284,43 @@ async def all_movies_page(request: Request, db: Session = Depends(get_db)):
             "username": request.session["username"]
         }
     
-    all_movies = MovieService.get_all(db)
-    
-    # Enrichir et trier par note IMDb
-    sorted_movies = await enrich_movies_with_imdb(all_movies)
+    # Filtres et tri en SQL (notes stockées en base, pas d'appel OMDb ici), page par curseur
+    genre = genre_slug(genre) if genre else None
+    sorted_movies, next_cursor = await db.run_sync(
+        BrowseService.browse, genre=genre, year=year, min_rating=min_rating, sort=sort,
+        limit=settings.MOVIES_PAGE_SIZE, cursor=cursor
+    )
+    facets = await db.run_sync(BrowseService.facets, genre=genre, year=year, min_rating=min_rating)
+
+    # Page anonyme déjà en cache chez le client : pas de rendu
+    etag_parts = ("movies", [(m.id, m.version) for m in sorted_movies], next_cursor, facets)
+    not_modified = page_not_modified(request, *etag_parts)
+    if not_modified:
+        return not_modified
 
     # Ajouter watchlist_ids
-    watchlist_ids = []
+    watchlist_ids = frozenset()
     if request.session.get("user_id"):
-        from backend.models import Watchlist
-        watchlist_ids = [row[0] for row in db.query(Watchlist.movie_id).filter(Watchlist.user_id == request.session["user_id"]).all()]
+        watchlist_ids = await db.run_sync(WatchlistService.get_movie_ids, request.session["user_id"])
 
-    return templates.TemplateResponse("movies.html", {
+    genre_name = next((g["name"] for g in facets["genres"] if g["slug"] == genre), genre)
+    response = templates.TemplateResponse("movies.html", {
         "request": request, 
         "movies": sorted_movies,
-        "list_title": "Tous les films (triés par note IMDb)",
+        "list_title": f"{genre_name or 'Tous les films'} (triés par {SORT_LABELS[sort]})",
         "title": "Films",
         "current_user": current_user,
         "watchlist_ids": watchlist_ids,
-        "show_imdb_rating": True  # Afficher les notes IMDb
+        "show_imdb_rating": True,  # Afficher les notes IMDb
+        "next_cursor": next_cursor,
+        "facets": facets,
+        "filters": {"genre": genre, "year": year, "min_rating": min_rating, "sort": sort},
+        "sort_labels": SORT_LABELS
     })
+    return set_page_cache_headers(request, response, *etag_parts)
 
 @app.get("/movies/{type}", response_class=HTMLResponse)
-async def movie_list(request: Request, type: str, db: Session = Depends(get_db)):
+async def movie_list(request: Request, type: str, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db)):
     """Movie list page by type"""
     # Récupérer l'utilisateur depuis la session
     current_user = None
@@ -258,48 +331,23 @@ async def movie_list(request: Request, type: str, db: Session = Depends(get_db))
         }
 
     # watchlist_ids pour toutes les variantes
-    watchlist_ids = []
+    watchlist_ids = frozenset()
     if current_user:
-        from backend.models import Watchlist
-        watchlist_ids = [row[0] for row in db.query(Watchlist.movie_id).filter(Watchlist.user_id == current_user["id"]).all()]
+        watchlist_ids = await db.run_sync(WatchlistService.get_movie_ids, current_user["id"])
 
     if type == "top_rated":
         # Exiger une connexion
         if not current_user:
             return RedirectResponse(url="/login", status_code=303)
 
-        # Import models locally to avoid circular imports
-        from backend.models import Rating, Movie
-
-        # latest rating row per movie for this user
-        latest_q = (
-            db.query(
-                Rating.movie_id.label("movie_id"),
-                func.max(Rating.id).label("latest_id")
-            )
-            .filter(Rating.user_id == current_user["id"])
-            .group_by(Rating.movie_id)
-            .subquery()
-        )
-        Rlatest = aliased(Rating)
-        # LEFT OUTER JOIN to include unrated movies, order: rated first (NULL last), then score desc, then title asc
-        rows = (
-            db.query(
-                Movie,
-                Rlatest.score.label("user_score"),
-            )
-            .outerjoin(latest_q, latest_q.c.movie_id == Movie.id)
-            .outerjoin(Rlatest, Rlatest.id == latest_q.c.latest_id)
-            .order_by(
-                Rlatest.score.is_(None),  # NULL last
-                Rlatest.score.desc(),      # 5, 4, 3, 2, 1
-                Movie.title.asc()
-            )
-            .all()
+        # Films notés (index user_id, score DESC) puis films non notés, page par curseur
+        rows, next_cursor = await db.run_sync(
+            RankingService.get_page, current_user["id"],
+            limit=settings.MOVIES_PAGE_SIZE, cursor=cursor, include_unrated=True
         )
         filtered_movies = []
         for M, s in rows:
-            setattr(M, "user_rating", int(s) if s is not None else None)
+            setattr(M, "user_rating", s)
             filtered_movies.append(M)
 
         return templates.TemplateResponse("movies.html", {
@@ -309,7 +357,8 @@ async def movie_list(request: Request, type: str, db: Session = Depends(get_db))
             "title": "Mon Classement",
             "current_user": current_user,
             "watchlist_ids": watchlist_ids,
-            "show_imdb_rating": False  # PAS de notes IMDb dans Mon Classement
+            "show_imdb_rating": False,  # PAS de notes IMDb dans Mon Classement
+            "next_cursor": next_cursor
         })
 
     elif type == "watchlist":
@@ -318,13 +367,15 @@ async def movie_list(request: Request, type: str, db: Session = Depends(get_db))
         
         from backend.models import Watchlist, Movie
         
-        watchlist_movies = (
-            db.query(Movie)
+        watchlist_movies, next_cursor = await db.run_sync(lambda session: paginate(
+            session.query(Movie)
             .join(Watchlist, Watchlist.movie_id == Movie.id)
-            .filter(Watchlist.user_id == current_user["id"])
-            .order_by(Movie.title)
-            .all()
-        )
+            .filter(Watchlist.user_id == current_user["id"]),
+            [(Movie.title, False), (Movie.id, False)],
+            lambda m: [m.title, m.id],
+            settings.MOVIES_PAGE_SIZE,
+            cursor
+        ))
         
         # PAS d'enrichissement IMDb pour la watchlist
         
@@ -335,24 +386,32 @@ async def movie_list(request: Request, type: str, db: Session = Depends(get_db))
             "title": "Ma Watchlist",
             "current_user": current_user,
             "watchlist_ids": watchlist_ids,
-            "show_imdb_rating": False  # PAS de notes IMDb dans la watchlist
+            "show_imdb_rating": False,  # PAS de notes IMDb dans la watchlist
+            "next_cursor": next_cursor
         })
 
     # default: all movies sorted by IMDb
-    all_movies = MovieService.get_all(db)
-    sorted_movies = await enrich_movies_with_imdb(all_movies)
-    return templates.TemplateResponse("movies.html", {
+    sorted_movies, next_cursor = await db.run_sync(
+        MovieService.get_page_by_imdb_rating, limit=settings.MOVIES_PAGE_SIZE, cursor=cursor
+    )
+    etag_parts = ("movies", type, [(m.id, m.version) for m in sorted_movies], next_cursor)
+    not_modified = page_not_modified(request, *etag_parts)
+    if not_modified:
+        return not_modified
+    response = templates.TemplateResponse("movies.html", {
         "request": request,
         "movies": sorted_movies,
         "list_title": "Films (triés par note IMDb)",
         "title": "Films",
         "current_user": current_user,
         "watchlist_ids": watchlist_ids,
-        "show_imdb_rating": True  # Afficher les notes IMDb
+        "show_imdb_rating": True,  # Afficher les notes IMDb
+        "next_cursor": next_cursor
     })
+    return set_page_cache_headers(request, response, *etag_parts)
 
 @app.get("/top-rated", response_class=HTMLResponse)
-async def top_rated_page(request: Request, db: Session = Depends(get_db)):
+async def top_rated_page(request: Request, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db)):
     """Top rated page showing ONLY movies rated by CURRENT USER, ordered by THEIR score desc"""
     
     # ✅ Vérifier authentification
@@ -365,45 +424,23 @@ async def top_rated_page(request: Request, db: Session = Depends(get_db)):
         "username": request.session["username"]
     }
 
-    from backend.models import Rating, Movie
-
-   
-    # Prendre la DERNIÈRE note par film (au cas où l'utilisateur aurait changé sa note)
-    latest_q = (
-        db.query(
-            Rating.movie_id.label("movie_id"),
-            func.max(Rating.id).label("latest_id")
-        )
-        .filter(Rating.user_id == user_id)  
-        .group_by(Rating.movie_id)
-        .subquery()
-    )
-    
-    Rlatest = aliased(Rating)
-    
-    # JOIN pour récupérer les films avec la dernière note
-    rows = (
-        db.query(
-            Movie,
-            Rlatest.score.label("user_score")
-        )
-        .join(latest_q, latest_q.c.movie_id == Movie.id)
-        .join(Rlatest, Rlatest.id == latest_q.c.latest_id)
-        .all()
+    # Notes de l'utilisateur par score décroissant, lues dans l'index (user_id, score DESC)
+    rows, next_cursor = await db.run_sync(
+        RankingService.get_page, user_id, limit=settings.MOVIES_PAGE_SIZE, cursor=cursor
     )
-
-  
-    rated_movies = [{"movie": M, "rating": int(s)} for M, s in rows]
-    rated_movies.sort(key=lambda x: (-x["rating"], x["movie"].title))
+    rated_movies = [{"movie": M, "rating": s} for M, s in rows]
+    watchlist_ids = await db.run_sync(WatchlistService.get_movie_ids, user_id)
 
     return templates.TemplateResponse("top_rated.html", {
         "request": request,
         "rated_movies": rated_movies,
-        "current_user": current_user
+        "current_user": current_user,
+        "next_cursor": next_cursor,
+        "watchlist_ids": watchlist_ids
     })
 
 @app.get("/movie/{movie_id}", response_class=HTMLResponse)
-async def movie_page(request: Request, movie_id: int, db: Session = Depends(get_db)):
+async def movie_page(request: Request, movie_id: int, comments_cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_read_db)):
     # Récupérer l'utilisateur depuis la session
     current_user = None
     if request.session.get("user_id"):
@@ -412,38 +449,47 @@ async def movie_page(request: Request, movie_id: int, db: Session = Depends(get_
             "username": request.session["username"]
         }
 
+    # Page anonyme déjà en cache chez le client : ni chargement du film et des commentaires, ni rendu
+    from backend.services.comment_service import CommentService  # éviter import circulaire en haut
+    etag_parts = (
+        "movie", movie_id, await db.run_sync(MovieService.get_version, movie_id),
+        await db.run_sync(CommentService.get_movie_stamp, movie_id), comments_cursor
+    )
+    not_modified = page_not_modified(request, *etag_parts)
+    if not_modified:
+        return not_modified
+
     # Récupérer le film
-    movie = MovieService.get_by_id(db, movie_id)
+    movie = await db.run_sync(MovieService.get_by_id, movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
 
-    # Récupérer les commentaires (avec l'utilisateur si relation configurée)
-    from backend.models import Comment  # éviter import circulaire en haut
-    comments = db.query(Comment)\
-                 .filter(Comment.movie_id == movie_id)\
-                 .order_by(Comment.created_at.desc())\
-                 .all()
+    # Commentaires avec le nom de l'auteur (une requête jointe), paginés par curseur
+    comments, comments_next_cursor = await db.run_sync(
+        CommentService.get_views_by_movie, movie_id, limit=settings.COMMENTS_PAGE_SIZE, cursor=comments_cursor
+    )
 
     # watchlist_ids pour l'état du cœur sur la page détail
-    watchlist_ids = []
+    watchlist_ids = frozenset()
     if current_user:
-        from backend.models import Watchlist
-        watchlist_ids = [row[0] for row in db.query(Watchlist.movie_id).filter(Watchlist.user_id == current_user["id"]).all()]
+        watchlist_ids = await db.run_sync(WatchlistService.get_movie_ids, current_user["id"])
 
     # Fournir l'URL de l'API au frontend
     api_url = "/api"
 
-    return templates.TemplateResponse("movie.html", {
+    response = templates.TemplateResponse("movie.html", {
         "request": request,
         "movie": movie,
         "comments": comments,
+        "comments_next_cursor": comments_next_cursor,
         "current_user": current_user,
         "api_url": api_url,
         "watchlist_ids": watchlist_ids
     })
+    return set_page_cache_headers(request, response, *etag_parts)
 
 @app.post("/movie/{movie_id}/comment")
-async def post_movie_comment(request: Request, movie_id: int, db: Session = Depends(get_db)):
+async def post_movie_comment(request: Request, movie_id: int, db: AsyncSession = Depends(get_async_db)):
     # Vérifier authentification
     user_id = request.session.get("user_id")
     if not user_id:
@@ -458,34 +504,34 @@ async def post_movie_comment(request: Request, movie_id: int, db: Session = Depe
     from backend.models import Comment
     comment = Comment(user_id=user_id, movie_id=movie_id, content=content)
     db.add(comment)
-    db.commit()
+    await db.commit()
+    mark_write(request)
 
     return RedirectResponse(url=f"/movie/{movie_id}", status_code=303)
 
 # ========== RATING API FOR MOVIE PAGE (session-based) ==========
 @app.get("/api/movies/{movie_id}/rating")
-async def api_get_movie_rating(movie_id: int, request: Request, db: Session = Depends(get_db)):
+async def api_get_movie_rating(movie_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
     from backend.models import Rating
+    from backend.services.rating_stats_service import RatingStatsService
     
-    avg, count = db.query(func.avg(cast(Rating.score, Integer)), func.count(Rating.id))\
-                   .filter(Rating.movie_id == movie_id).one()
+    summary = await db.run_sync(RatingStatsService.summary, movie_id)
     
     user_rating = None
     if request.session.get("user_id"):
-        r = db.query(Rating).filter(
+        score = await db.scalar(select(Rating.score).where(
             Rating.movie_id == movie_id,
             Rating.user_id == request.session["user_id"]
-        ).first()
-        user_rating = int(r.score) if r else None
+        ))
+        user_rating = int(score) if score is not None else None
     
     return {
-        "average": float(avg) if avg is not None else None,
-        "count": int(count or 0),
+        **summary,
         "user_rating": user_rating
     }
 
 @app.post("/api/movies/{movie_id}/rating")
-async def api_set_movie_rating(movie_id: int, request: Request, db: Session = Depends(get_db)):
+async def api_set_movie_rating(movie_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     # Require session login for web rating
     user_id = request.session.get("user_id")
     if not user_id:
@@ -499,25 +545,34 @@ async def api_set_movie_rating(movie_id: int, request: Request, db: Session = De
     if value < 1 or value > 5:
         return HTMLResponse(status_code=400, content='{"error":"rating must be between 1 and 5"}', media_type="application/json")
 
-    from backend.models import Rating
-    r = db.query(Rating).filter(Rating.movie_id == movie_id, Rating.user_id == user_id).first()
-    if r:
-        r.score = value
-    else:
-        r = Rating(movie_id=movie_id, user_id=user_id, score=value)
-        db.add(r)
-    db.commit()
-
-    avg, count = db.query(func.avg(Rating.score), func.count(Rating.id))\
-                   .filter(Rating.movie_id == movie_id).one()
+    from backend.services.rating_stats_service import RatingStatsService
+
+    def rate(session: Session):
+        # Film vérifié explicitement : SQLite n'applique pas les clés étrangères
+        if MovieService.get_version(session, movie_id) is None:
+            return None
+        # Upsert atomique puis agrégat (mis à jour par trigger) lu dans la même transaction
+        RatingService.upsert(session, user_id, movie_id, value)
+        return RatingStatsService.summary(session, movie_id)
+
+    try:
+        summary = await db.run_sync(rate)
+        if summary is None:
+            return HTMLResponse(status_code=404, content='{"error":"movie not found"}', media_type="application/json")
+        await db.commit()
+    except IntegrityError:
+        # Film déjà vérifié : seule la clé étrangère de l'utilisateur (supprimé depuis la connexion) peut échouer
+        await db.rollback()
+        return HTMLResponse(status_code=401, content='{"error":"unauthorized"}', media_type="application/json")
+    mark_write(request)
+
     return {
-        "average": float(avg) if avg is not None else None,
-        "count": int(count or 0),
+        **summary,
         "user_rating": value
     }
 
 @app.post("/api/web/watchlist/toggle")
-async def toggle_watchlist(request: Request, db: Session = Depends(get_db)):
+async def toggle_watchlist(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Toggle un film dans la watchlist (utilisateur de la session)."""
     user_id = request.session.get("user_id")
     if not user_id:
@@ -530,39 +585,55 @@ async def toggle_watchlist(request: Request, db: Session = Depends(get_db)):
     if not movie_id:
         return HTMLResponse(status_code=400, content='{"error":"movie_id required"}', media_type="application/json")
 
-    from backend.models import Watchlist
-    existing = db.query(Watchlist).filter(
-        Watchlist.user_id == user_id,
-        Watchlist.movie_id == movie_id
-    ).first()
-
-    if existing:
-        db.delete(existing)
-        db.commit()
-        return {"active": False}
-    else:
-        w = Watchlist(user_id=user_id, movie_id=movie_id, status="planned")
-        db.add(w)
-        db.commit()
-        return {"active": True}
+    def toggle(session: Session):
+        # Film vérifié explicitement : SQLite n'applique pas les clés étrangères
+        if MovieService.get_version(session, movie_id) is None:
+            return None
+        # Insertion ou suppression sans lecture préalable : deux clics simultanés ne heurtent plus la contrainte unique
+        return WatchlistService.toggle(session, user_id, movie_id)
+
+    try:
+        active = await db.run_sync(toggle)
+        if active is None:
+            return HTMLResponse(status_code=404, content='{"error":"movie not found"}', media_type="application/json")
+        await db.commit()
+    except IntegrityError:
+        # Film déjà vérifié : seule la clé étrangère de l'utilisateur (supprimé depuis la connexion) peut échouer
+        await db.rollback()
+        return HTMLResponse(status_code=401, content='{"error":"unauthorized"}', media_type="application/json")
+    mark_write(request)
+    WatchlistService.invalidate_movie_ids(user_id)
+    return {"active": active}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Métriques Prometheus (scrapées sur le port de l'application, non relayées par nginx)"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404)
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
 
 @app.get("/api/movies/{movie_id}/debug")
-async def api_debug_movie(movie_id: int, db: Session = Depends(get_db)):
+async def api_debug_movie(movie_id: int, db: AsyncSession = Depends(get_async_db)):
     """DEBUG: Affiche TOUS les attributs du film pour identifier le bon champ."""
-    m = MovieService.get_by_id(db, movie_id)
+    m = await db.run_sync(MovieService.get_by_id, movie_id)
     if not m:
         raise HTTPException(status_code=404, detail="Movie not found")
     
-    # Récupérer tous les attributs du modèle
-    all_attrs = {}
-    for key in dir(m):
-        if not key.startswith('_'):
-            try:
-                val = getattr(m, key, None)
-                if not callable(val):
-                    all_attrs[key] = str(val)[:100] if val is not None else None
-            except:
-                pass
+    # Récupérer tous les attributs du modèle (les relations se chargent en synchrone dans run_sync)
+    def dump_attributes(session: Session):
+        all_attrs = {}
+        for key in dir(m):
+            if not key.startswith('_'):
+                try:
+                    val = getattr(m, key, None)
+                    if not callable(val):
+                        all_attrs[key] = str(val)[:100] if val is not None else None
+                except:
+                    pass
+        return all_attrs
+    
+    all_attrs = await db.run_sync(dump_attributes)
     
     return {
         "movie_id": m.id,
@@ -570,55 +641,10 @@ async def api_debug_movie(movie_id: int, db: Session = Depends(get_db)):
         "all_attributes": all_attrs
     }
 
-# Cache simple en mémoire pour les notes IMDb (évite de spammer l'API)
-IMDB_RATING_CACHE = {}
-
-async def fetch_imdb_rating(imdb_id: str) -> float:
-    """Récupère la note IMDb depuis l'API OMDB avec cache."""
-    if not imdb_id:
-        return None
-    
-    # Vérifier le cache
-    if imdb_id in IMDB_RATING_CACHE:
-        return IMDB_RATING_CACHE[imdb_id]
-    
-    # Récupérer la clé API depuis l'environnement
-    OMDB_API_KEY = os.getenv("OMDB_API_KEY")
-    
-    if not OMDB_API_KEY:
-        print("⚠️  OMDB_API_KEY manquante dans .env")
-        return None
-    
-    try:
-        url = f"http://www.omdbapi.com/?i={imdb_id}&apikey={OMDB_API_KEY}"
-        print(f"🔍 Fetching IMDb rating for {imdb_id} with key {OMDB_API_KEY[:4]}****")
-        
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            print(f"📡 Response status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"Response data: {data}")
-                
-                if data.get("Response") == "True" and "imdbRating" in data:
-                    rating = float(data["imdbRating"])
-                    print(f"Rating found: {rating}")
-                    IMDB_RATING_CACHE[imdb_id] = rating
-                    return rating
-                else:
-                    print(f"Invalid response: {data}")
-            else:
-                print(f"HTTP Error {response.status_code}")
-    except Exception as e:
-        print(f"Erreur OMDB pour {imdb_id}: {e}")
-    
-    return None
-
 @app.get("/api/movies/{movie_id}/imdb")
-async def api_get_imdb_rating(movie_id: int, db: Session = Depends(get_db)):
+async def api_get_imdb_rating(movie_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Récupère la note IMDb d'un film (sur 10 et convertie sur 5)."""
-    movie = MovieService.get_by_id(db, movie_id)
+    movie = await db.run_sync(MovieService.get_by_id, movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
     
@@ -631,19 +657,42 @@ async def api_get_imdb_rating(movie_id: int, db: Session = Depends(get_db)):
             "source": "no_imdb_id"
         }
     
-    rating_10 = await fetch_imdb_rating(movie.imdb_id)
-    rating_5 = round(rating_10 / 2, 1) if rating_10 else None
-    
-    return {
+    # Note fraîche en base : réponse déterminée par la note et sa date de récupération
+    stale = ImdbRatingService.is_stale(movie)
+    if not stale and movie.imdb_rating is not None:
+        etag = make_etag("imdb", movie_id, movie.imdb_id, movie.imdb_rating, "database")
+        not_modified = not_modified_response(request, etag, IMDB_CACHE_CONTROL, movie.imdb_rating_fetched_at)
+        if not_modified:
+            return not_modified
+    
+    source = "database"
+    if stale:
+        rating = await ImdbRatingService.fetch_rating(movie.imdb_id)
+        # Échec daté aussi : la tâche de fond ne redemandera pas ce film avant le TTL négatif
+        await db.run_sync(ImdbRatingService.store_ratings, {movie.imdb_id: rating})
+        await db.refresh(movie)
+        if rating is not None:
+            source = "omdb_live"
+    
+    rating_10 = movie.imdb_rating
+    source = source if rating_10 else "unavailable"
+    
+    response = JSONResponse({
         "movie_id": movie_id,
         "imdb_id": movie.imdb_id,
         "imdb_rating_10": rating_10,
-        "imdb_rating_5": rating_5,
-        "source": "omdb_live" if rating_10 else "unavailable"
-    }
+        "imdb_rating_5": movie.imdb_rating_5,
+        "source": source
+    })
+    if source == "unavailable":
+        # Échec OMDb : ne pas mettre en cache, un nouvel essai pourra réussir
+        response.headers["Cache-Control"] = "no-store"
+        return response
+    etag = make_etag("imdb", movie_id, movie.imdb_id, rating_10, source)
+    return set_cache_headers(response, etag, IMDB_CACHE_CONTROL, movie.imdb_rating_fetched_at)
     
 @app.get("/add-movie", response_class=HTMLResponse)
-async def add_movie_page(request: Request, db: Session = Depends(get_db)):
+async def add_movie_page(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """Page pour ajouter un film"""
     current_user = None
     if request.session.get("user_id"):
@@ -654,7 +703,7 @@ async def add_movie_page(request: Request, db: Session = Depends(get_db)):
     
     # Récupérer les films récemment ajoutés
     from backend.services.movie_service import MovieService
-    recent_movies = MovieService.get_recently_added(db, limit=6)
+    recent_movies = await db.run_sync(MovieService.get_recently_added, limit=6)
     
     return templates.TemplateResponse("add_movie.html", {
         "request": request,
@@ -666,7 +715,7 @@ async def add_movie_page(request: Request, db: Session = Depends(get_db)):
 @app.get("/api/search/external")
 async def search_external_movies_api(
     query: str = "", 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API pour rechercher des films sur OMDb (auto-complétion)"""
     if len(query) < 2:
@@ -674,11 +723,11 @@ async def search_external_movies_api(
     
     try:
         from backend.services.movie_service import MovieService
-        results = MovieService.search_external_movies(query)
+        results = await MovieService.search_external_movies(query)
         
         return {"results": results}
     except Exception as e:
-        print(f"❌ Erreur recherche externe: {e}")
+        logger.warning("Erreur recherche externe", extra={"query": query, "error": str(e)})
         return JSONResponse(
             status_code=500,
             content={"results": [], "error": str(e)}
@@ -688,7 +737,7 @@ async def search_external_movies_api(
 async def add_movie_by_imdb_api(
     request: Request,
     imdb_id: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API pour ajouter un film depuis IMDb ID"""
     # Vérifier authentification
@@ -702,7 +751,7 @@ async def add_movie_by_imdb_api(
     
     try:
         # Vérifier si le film existe déjà
-        existing = MovieService.get_by_imdb_id(db, imdb_id)
+        existing = await db.run_sync(MovieService.get_by_imdb_id, imdb_id)
         if existing:
             return JSONResponse(
                 content={
@@ -713,7 +762,7 @@ async def add_movie_by_imdb_api(
             )
         
         # Créer le film
-        movie = MovieService.create_from_imdb_id(db, imdb_id)
+        movie = await MovieService.create_from_imdb_id(db, imdb_id)
         
         if not movie:
             return JSONResponse(
@@ -724,6 +773,7 @@ async def add_movie_by_imdb_api(
                 }
             )
         
+        mark_write(request)
         return JSONResponse(
             content={
                 "status": "success",
@@ -735,7 +785,7 @@ async def add_movie_by_imdb_api(
         )
         
     except Exception as e:
-        print(f"❌ Erreur ajout film: {e}")
+        logger.exception("Erreur ajout film", extra={"imdb_id": imdb_id})
         return JSONResponse(
             status_code=500,
             content={
@@ -776,17 +826,20 @@ async def test_add_page():
 @app.get("/api/search/movies")
 async def search_movies_api(
     query: str = "", 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """API pour rechercher des films dans la base de données"""
-    print(f"🔍 SEARCH API called with query: '{query}'")
+    # Index mémoire (préfixes des mots du titre), sans requête SQL
+    if autocomplete_index.ready:
+        movies_data = autocomplete_index.search(query, limit=20)
+        return movies_data
     
     from backend.services.movie_service import MovieService
-    results = MovieService.search_by_title(db, query)
+    results = await db.run_sync(MovieService.search_by_title, query, limit=20)
     
     # Convert SQLAlchemy objects to dictionaries
     movies_data = []
-    for movie in results[:20]:
+    for movie in results:
         movies_data.append({
             "id": movie.id,
             "title": movie.title,
@@ -797,11 +850,10 @@ async def search_movies_api(
             "genres": movie.genres
         })
     
-    print(f"📊 Returning {len(movies_data)} movies for query: '{query}'")
     return movies_data
 
 @app.get("/search")
-async def search_page(request: Request, query: str = "", db: Session = Depends(get_db)):
+async def search_page(request: Request, query: str = "", db: AsyncSession = Depends(get_async_read_db)):
     """Page de résultats de recherche"""
     current_user = None
     if request.session.get("user_id"):
@@ -813,14 +865,18 @@ async def search_page(request: Request, query: str = "", db: Session = Depends(g
     results = []
     if query:
         from backend.services.movie_service import MovieService
-        results = MovieService.search_by_title(db, query)
+        results = await db.run_sync(MovieService.search_by_title, query, limit=100)
+    
+    etag_parts = ("search", query, [(m.id, m.version) for m in results])
+    not_modified = page_not_modified(request, *etag_parts)
+    if not_modified:
+        return not_modified
     
-    watchlist_ids = []
+    watchlist_ids = frozenset()
     if current_user:
-        from backend.models import Watchlist
-        watchlist_ids = [row[0] for row in db.query(Watchlist.movie_id).filter(Watchlist.user_id == current_user["id"]).all()]
+        watchlist_ids = await db.run_sync(WatchlistService.get_movie_ids, current_user["id"])
     
-    return templates.TemplateResponse("movies.html", {
+    response = templates.TemplateResponse("movies.html", {
         "request": request,
         "movies": results,
         "list_title": f"Résultats pour: '{query}'",
@@ -830,4 +886,5 @@ async def search_page(request: Request, query: str = "", db: Session = Depends(g
         "show_imdb_rating": True,
         "search_query": query
     })
+    return set_page_cache_headers(request, response, *etag_parts)
 
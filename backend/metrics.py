@@ -0,0 +1,263 @@
+"""
+Métriques Prometheus (exposées sur /metrics)
+- latence par route (middleware ASGI, route = gabarit de chemin, pas l'URL)
+- nombre et durée des requêtes SQL par requête HTTP (événements SQLAlchemy)
+- durée des appels aux APIs externes (hooks httpx)
+- durée de rendu des gabarits Jinja
+- état des pools de connexions, du pool bcrypt et des caches mémoire
+Les compteurs de la requête en cours vivent dans une contextvar : ils suivent
+la requête dans les threads (run_in_threadpool) et dans les greenlets
+d'AsyncSession.
+"""
+import contextvars
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlsplit
+import jinja2
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.config import get_settings
+from backend.db_pool import pool_label
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+REQUEST_DURATION = Histogram(
+    "rapidocine_http_request_duration_seconds", "Durée des requêtes HTTP",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+REQUEST_DB_QUERIES = Histogram(
+    "rapidocine_http_request_db_queries", "Requêtes SQL par requête HTTP",
+    ["route"], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+)
+REQUEST_DB_DURATION = Histogram(
+    "rapidocine_http_request_db_duration_seconds", "Temps SQL cumulé par requête HTTP",
+    ["route"], buckets=LATENCY_BUCKETS
+)
+DB_QUERY_DURATION = Histogram(
+    "rapidocine_db_query_duration_seconds", "Durée d'une requête SQL",
+    ["engine"], buckets=FAST_BUCKETS
+)
+EXTERNAL_DURATION = Histogram(
+    "rapidocine_external_request_duration_seconds", "Durée des appels aux APIs externes (jusqu'aux en-têtes)",
+    ["host", "status"], buckets=LATENCY_BUCKETS
+)
+TEMPLATE_DURATION = Histogram(
+    "rapidocine_template_render_seconds", "Durée de rendu d'un gabarit",
+    ["template"], buckets=FAST_BUCKETS
+)
+
+
+@dataclass
+class RequestStats:
+    """Compteurs de la requête HTTP en cours"""
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    external_calls: int = 0
+    external_seconds: float = 0.0
+    template_seconds: float = 0.0
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+
+# ========== Middleware ==========
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mount (fichiers statiques) : root_path prolongé du préfixe monté
+    app_root_path = scope.get("app_root_path")
+    if app_root_path is not None and scope.get("root_path", "") != app_root_path:
+        return scope["root_path"][len(app_root_path):] + "/*"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : latence par route, SQL par requête, journal des requêtes lentes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            route = _route_label(scope)
+            REQUEST_DURATION.labels(scope["method"], route, str(status)).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(route).observe(stats.db_queries)
+            REQUEST_DB_DURATION.labels(route).observe(stats.db_seconds)
+
+            fields = {
+                "method": scope["method"],
+                "route": route,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 1),
+                "db_queries": stats.db_queries,
+                "db_ms": round(stats.db_seconds * 1000, 1),
+                "external_calls": stats.external_calls,
+                "external_ms": round(stats.external_seconds * 1000, 1),
+                "template_ms": round(stats.template_seconds * 1000, 1),
+            }
+            if elapsed >= settings.SLOW_REQUEST_SECONDS:
+                logger.warning("Requête lente", extra=fields)
+            else:
+                logger.debug("Requête", extra=fields)
+
+
+# ========== SQLAlchemy ==========
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    DB_QUERY_DURATION.labels(pool_label(conn.engine.pool)).observe(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engines():
+    """Chronométrer toutes les requêtes SQL (moteurs synchrones et asynchrones)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ========== httpx ==========
+
+async def _on_http_request(request):
+    request.extensions["metrics_started"] = time.perf_counter()
+
+
+async def _on_http_response(response):
+    started = response.request.extensions.get("metrics_started")
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    EXTERNAL_DURATION.labels(urlsplit(str(response.request.url)).hostname or "", str(response.status_code)).observe(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.external_calls += 1
+        stats.external_seconds += elapsed
+
+
+# Hooks du client partagé (voir http_client)
+HTTPX_EVENT_HOOKS = {"request": [_on_http_request], "response": [_on_http_response]}
+
+
+# ========== Jinja ==========
+
+class TimedTemplate(jinja2.Template):
+    """Gabarit dont chaque rendu est chronométré"""
+
+    def render(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            name = self.name or "<string>"
+            TEMPLATE_DURATION.labels(name).observe(elapsed)
+            stats = _current.get()
+            # Les fragments sont rendus pendant le rendu de la page : ne compter que le niveau le plus haut
+            if stats is not None and not name.startswith("partials/"):
+                stats.template_seconds += elapsed
+
+
+def instrument_templates(templates):
+    """À appeler avant le premier rendu (les gabarits chargés gardent leur classe)"""
+    templates.env.template_class = TimedTemplate
+
+
+# ========== Statistiques des composants ==========
+
+class ComponentCollector:
+    """Expose à chaque collecte les compteurs des pools et des caches"""
+
+    def collect(self):
+        from backend.cache import TTLCache
+        from backend.db_pool import pool_monitor
+        from backend.password_hasher import password_hasher
+
+        pool_gauges = {
+            key: GaugeMetricFamily(f"rapidocine_db_pool_{key}", f"Pool de connexions : {key}", labels=["pool"])
+            for key in ("size", "in_use", "idle", "overflow", "waiting", "saturation")
+        }
+        pool_counters = {
+            key: CounterMetricFamily(f"rapidocine_db_pool_{key}", f"Pool de connexions : {key}", labels=["pool"])
+            for key in ("checkouts", "timeouts", "wait_seconds")
+        }
+        for name, stats in pool_monitor.stats().items():
+            for key, family in pool_gauges.items():
+                if stats.get(key) is not None:
+                    family.add_metric([name], stats[key])
+            pool_counters["checkouts"].add_metric([name], stats["checkouts"])
+            pool_counters["timeouts"].add_metric([name], stats["timeouts"])
+            pool_counters["wait_seconds"].add_metric([name], stats["wait_seconds_total"])
+        yield from pool_gauges.values()
+        yield from pool_counters.values()
+
+        hasher = password_hasher.stats()
+        yield GaugeMetricFamily("rapidocine_password_hash_pending", "Hachages en attente", value=hasher["pending"])
+        for key in ("hashed", "verified", "rehashed", "rejected", "busy_seconds"):
+            yield CounterMetricFamily(f"rapidocine_password_hash_{key}", f"Pool bcrypt : {key}", value=hasher[key])
+
+        cache_size = GaugeMetricFamily("rapidocine_cache_entries", "Entrées en cache", labels=["cache"])
+        cache_counters = {
+            key: CounterMetricFamily(f"rapidocine_cache_{key}", f"Cache mémoire : {key}", labels=["cache"])
+            for key in ("hits", "negative_hits", "misses", "evictions", "coalesced")
+        }
+        for cache in TTLCache.instances():
+            stats = cache.stats()
+            cache_size.add_metric([stats["name"]], stats["size"])
+            for key, family in cache_counters.items():
+                family.add_metric([stats["name"]], stats[key])
+        yield cache_size
+        yield from cache_counters.values()
+
+
+_collector = ComponentCollector()
+
+
+def install_collectors():
+    try:
+        REGISTRY.register(_collector)
+    except ValueError:
+        pass  # déjà enregistré (rechargement du module principal)
+
+
+def render_latest():
+    """(corps, type de contenu) de la réponse /metrics"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -3,5 +3,7 @@ from .movie import Movie
 from .rating import Rating
 from .comment import Comment
 from .watchlist import Watchlist
+from .movie_rating_stats import MovieRatingStats
+from .genre import Genre, movie_genres
 
-__all__ = ["User", "Movie", "Rating", "Comment", "Watchlist"]
+__all__ = ["User", "Movie", "Rating", "Comment", "Watchlist", "MovieRatingStats", "Genre", "movie_genres"]
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime
+from datetime import datetime
+from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database import Base
@@ -12,6 +13,13 @@ class Comment(Base):
     movie_id = Column(Integer, ForeignKey("movies.id"), nullable=False, index=True)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
+    # Dernière modification (à la microseconde) : entre dans l'ETag de la page du film
+    updated_at = Column(DateTime, nullable=True, onupdate=datetime.utcnow)
+    
+    # Pagination des commentaires d'un film (plus récents d'abord)
+    __table_args__ = (
+        Index("ix_comments_movie_id_id", "movie_id", "id"),
+    )
     
     # Relations
     user = relationship("User", back_populates="comments")
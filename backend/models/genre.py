@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, Index
+from backend.database import Base
+
+
+# Association film <-> genre, maintenue par GenreService.sync
+# La clé primaire (movie_id, genre_id) sert la réécriture des genres d'un film,
+# l'index (genre_id, movie_id) la recherche des films d'un genre.
+movie_genres = Table(
+    "movie_genres",
+    Base.metadata,
+    Column("movie_id", Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True),
+    Column("genre_id", Integer, ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_movie_genres_genre_id_movie_id", "genre_id", "movie_id"),
+)
+
+
+class Genre(Base):
+    """Genre normalisé ; Movie.genres garde la liste texte pour l'affichage"""
+    __tablename__ = "genres"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), nullable=False)
+    slug = Column(String(50), nullable=False, unique=True, index=True)
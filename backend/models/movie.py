@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database import Base
@@ -6,6 +6,10 @@ from backend.database import Base
 
 class Movie(Base):
     __tablename__ = "movies"
+    __table_args__ = (
+        # Navigation à facettes : filtre / tri par année, puis note IMDb (comptes par année couverts)
+        Index("ix_movies_year_imdb_rating", "year", "imdb_rating"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     imdb_id = Column(String(20), unique=True, nullable=False, index=True)
@@ -17,7 +21,23 @@ class Movie(Base):
     genres = Column(String(255), nullable=True)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     
+    # Note IMDb (sur 10) persistée, rafraîchie en arrière-plan depuis OMDb
+    imdb_rating = Column(Float, nullable=True, index=True)
+    imdb_rating_fetched_at = Column(DateTime, nullable=True)
+    # Dernière demande à OMDb, réussie ou non : une note absente n'est pas redemandée à chaque passe
+    imdb_rating_checked_at = Column(DateTime, nullable=True)
+    
+    # Incrémentée à chaque modification du film (clé du cache de fragments HTML)
+    version = Column(Integer, nullable=True, default=1, server_default="1")
+    
     # Relations
     ratings = relationship("Rating", back_populates="movie", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="movie", cascade="all, delete-orphan")
     watchlist = relationship("Watchlist", back_populates="movie", cascade="all, delete-orphan")
+    # Maintenu en base par triggers : lecture seule côté ORM
+    rating_stats = relationship("MovieRatingStats", back_populates="movie", uselist=False, viewonly=True)
+    
+    @property
+    def imdb_rating_5(self):
+        """Note IMDb convertie sur 5"""
+        return round(self.imdb_rating / 2, 1) if self.imdb_rating else None
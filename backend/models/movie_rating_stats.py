@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from backend.database import Base
+
+
+class MovieRatingStats(Base):
+    """Agrégat des notes d'un film, maintenu par triggers sur la table ratings"""
+    __tablename__ = "movie_rating_stats"
+    
+    movie_id = Column(Integer, ForeignKey("movies.id"), primary_key=True)
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    # Histogramme : nombre de notes par valeur (1 à 5 étoiles)
+    count_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    count_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    count_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    count_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    count_5 = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    # NULL quand le film n'a plus de note ; indexé pour le tri par note de la communauté
+    average = Column(Float, nullable=True, index=True)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+    
+    # Relations
+    movie = relationship("Movie", back_populates="rating_stats", viewonly=True)
+    
+    @property
+    def distribution(self):
+        """Nombre de notes par valeur {1: n1, ..., 5: n5}"""
+        return {score: getattr(self, f"count_{score}") for score in range(1, 6)}
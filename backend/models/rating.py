@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database import Base
@@ -22,3 +22,7 @@ class Rating(Base):
     # Relations
     user = relationship("User", back_populates="ratings")
     movie = relationship("Movie", back_populates="ratings")
+
+
+# Classement personnel (RankingService) : plage d'index par utilisateur, déjà triée
+Index("ix_ratings_user_id_score_movie_id", Rating.user_id, Rating.score.desc(), Rating.movie_id)
@@ -0,0 +1,115 @@
+"""
+Pagination par curseur (keyset)
+Le curseur est opaque pour le client : il encode les valeurs de tri de la
+dernière ligne renvoyée. La page suivante filtre les lignes situées "après"
+ces valeurs au lieu d'utiliser OFFSET : une page profonde coûte autant que
+la première.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, or_, false
+
+# Ordre de tri : (expression, décroissant). La dernière clé doit être unique (id).
+Order = Sequence[Tuple[Any, bool]]
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible ou ne correspondant pas à l'ordre de tri"""
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    payload = json.dumps([_dump(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Curseur invalide: {e}")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Curseur invalide")
+    return [_load(v) for v in values]
+
+
+def _equals(column, value):
+    if value is None or isinstance(value, bool):
+        return column.is_(value)
+    return column == value
+
+
+def _step(column, value, descending):
+    if isinstance(value, bool):
+        # Clé booléenne (ex. col.is_(None)) : False < True
+        if value == descending:
+            return column.is_(not value)
+        return false()
+    return column < value if descending else column > value
+
+
+def _after(order: Order, values: Sequence):
+    """
+    Condition "strictement après" pour un tri lexicographique :
+    (a > va) OR (a = va AND b > vb) OR ...
+
+    Une valeur NULL n'a rien "après" elle dans sa propre colonne : les NULL
+    sont regroupés en fin de tri par une clé `col.is_(None)` placée avant.
+    """
+    clauses = []
+    for i, ((column, descending), value) in enumerate(zip(order, values)):
+        if value is None:
+            continue
+        prefix = [_equals(c, v) for (c, _), v in zip(order[:i], values[:i])]
+        clauses.append(and_(*prefix, _step(column, value, descending)))
+    return or_(*clauses) if clauses else false()
+
+
+def paginate(
+    query,
+    order: Order,
+    key: Callable[[Any], Sequence],
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List, Optional[str]]:
+    """
+    Appliquer tri, curseur et LIMIT à une requête ORM
+
+    Args:
+        order: clés de tri, la dernière unique
+        key: valeurs des clés de tri pour une ligne du résultat
+        cursor: curseur de la page précédente (None pour la première page)
+
+    Returns:
+        (lignes de la page, curseur de la page suivante ou None)
+    """
+    if cursor:
+        query = query.filter(_after(order, decode_cursor(cursor, len(order))))
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in order])
+
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(key(rows[limit - 1])) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def set_next_cursor(response, next_cursor: Optional[str]):
+    """Exposer le curseur suivant dans un en-tête (le corps reste une liste)"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
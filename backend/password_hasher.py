@@ -0,0 +1,107 @@
+"""
+Hachage des mots de passe hors de la boucle d'événements
+bcrypt coûte ~250 ms de CPU par appel : exécuté dans la boucle, une rafale de
+connexions bloquerait toutes les requêtes du worker. Les calculs partent dans
+un pool de threads dédié (bcrypt libère le GIL), avec une file bornée : au-delà,
+PasswordHasherBusy est levée et l'appelant répond 503 plutôt que d'empiler.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from backend.config import get_settings
+
+settings = get_settings()
+
+# min_rounds = rounds : un hash plus faible que le coût courant est signalé par needs_update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """File d'attente du pool de hachage pleine"""
+
+
+class PasswordHasher:
+    """Pool borné pour hash / vérification des mots de passe"""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.hashed = 0
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    def _timed(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.busy_seconds += elapsed
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy("Trop de demandes d'authentification en attente")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        result = await self._run(pwd_context.hash, password)
+        self.hashed += 1
+        return result
+
+    async def verify_and_update(self, password: str, password_hash: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Vérifier le mot de passe ; si le hash est à mettre à niveau (coût modifié),
+        retourne aussi le nouveau hash, calculé dans le même passage
+        """
+        self.verified += 1
+        if not password_hash:
+            # Utilisateur inconnu : même coût qu'une vraie vérification (pas d'énumération par le temps)
+            await self._run(pwd_context.dummy_verify)
+            return False, None
+        valid, new_hash = await self._run(pwd_context.verify_and_update, password, password_hash)
+        if valid and new_hash:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "hashed": self.hashed,
+                "verified": self.verified,
+                "rehashed": self.rehashed,
+                "rejected": self.rejected,
+                "busy_seconds": round(self.busy_seconds, 3),
+            }
+
+
+# Pool partagé par le processus
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
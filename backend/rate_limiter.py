@@ -0,0 +1,41 @@
+"""
+Limiteur de débit (token bucket) pour les APIs externes
+Remplace les pauses fixes : les appels partent immédiatement tant qu'il reste
+des jetons, puis sont espacés au débit configuré.
+"""
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Seau à jetons : `rate` jetons par seconde, jusqu'à `capacity` en rafale"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        # Verrou de thread (et non asyncio) : le seau reste utilisable
+        # d'une boucle d'événements à l'autre (scripts via asyncio.run)
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Réserve un jeton ; retourne le délai à attendre avant de l'utiliser"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self):
+        """Attendre un jeton (rate <= 0 : pas de limite)"""
+        if self.rate <= 0:
+            return
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
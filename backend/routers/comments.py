@@ -1,33 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional
+from backend.batch_write import write_batch
+from backend.config import get_settings
 from backend.database import get_db
-from backend.schemas import Comment, CommentCreate, CommentUpdate
+from backend.pagination import set_next_cursor
+from backend.schemas import BulkWriteResult, Comment, CommentCreate, CommentUpdate, CommentView
 from backend.services import CommentService
 
+settings = get_settings()
+
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
 
 @router.get("/", response_model=List[Comment])
 def get_comments(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
     db: Session = Depends(get_db)
 ):
-    """Récupérer tous les commentaires"""
-    return CommentService.get_all(db, skip=skip, limit=limit)
+    """Récupérer tous les commentaires (pagination par curseur, OFFSET conservé pour compatibilité)"""
+    if skip and not cursor:
+        return CommentService.get_all(db, skip=skip, limit=limit)
+    comments, next_cursor = CommentService.get_page(db, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return comments
 
 
 @router.get("/user/{user_id}", response_model=List[Comment])
-def get_comments_by_user(user_id: int, db: Session = Depends(get_db)):
-    """Récupérer les commentaires d'un utilisateur"""
-    return CommentService.get_by_user(db, user_id)
+def get_comments_by_user(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
+    db: Session = Depends(get_db)
+):
+    """Récupérer les commentaires d'un utilisateur (paginés si limit ou cursor est fourni)"""
+    if limit is None and cursor is None:
+        return CommentService.get_by_user(db, user_id)
+    comments, next_cursor = CommentService.get_page(db, limit=limit or 100, cursor=cursor, user_id=user_id)
+    set_next_cursor(response, next_cursor)
+    return comments
 
 
 @router.get("/movie/{movie_id}", response_model=List[Comment])
-def get_comments_by_movie(movie_id: int, db: Session = Depends(get_db)):
-    """Récupérer les commentaires d'un film"""
-    return CommentService.get_by_movie(db, movie_id)
+def get_comments_by_movie(
+    movie_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
+    db: Session = Depends(get_db)
+):
+    """Récupérer les commentaires d'un film (paginés si limit ou cursor est fourni)"""
+    if limit is None and cursor is None:
+        return CommentService.get_by_movie(db, movie_id)
+    comments, next_cursor = CommentService.get_page(db, limit=limit or 100, cursor=cursor, movie_id=movie_id)
+    set_next_cursor(response, next_cursor)
+    return comments
+
+
+@router.get("/movie/{movie_id}/views", response_model=List[CommentView])
+def get_comment_views_by_movie(
+    movie_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
+    db: Session = Depends(get_db)
+):
+    """Commentaires d'un film avec le nom de l'auteur (plus récents d'abord)"""
+    views, next_cursor = CommentService.get_views_by_movie(db, movie_id, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return views
 
 
 @router.get("/{comment_id}", response_model=Comment)
@@ -45,6 +90,17 @@ def create_comment(comment: CommentCreate, db: Session = Depends(get_db)):
     return CommentService.create(db, comment)
 
 
+@router.post("/bulk", response_model=BulkWriteResult)
+def bulk_create_comments(
+    items: List[Dict[str, Any]] = Body(..., max_length=settings.BULK_WRITE_MAX_ITEMS, description="Éléments au format de POST /"),
+    db: Session = Depends(get_db)
+):
+    """Créer des commentaires par lot (une transaction, un résultat par élément)"""
+    return write_batch(
+        db, CommentCreate, items, CommentService.bulk_create
+    )
+
+
 @router.put("/{comment_id}", response_model=Comment)
 def update_comment(
     comment_id: int,
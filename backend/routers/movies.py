@@ -1,55 +1,133 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
-from backend.database import get_db
-from backend.schemas import Movie, MovieCreate, MovieUpdate
-from backend.services import MovieService
+from typing import List, Optional
+from backend.database import get_db, get_read_db
+from backend.pagination import set_next_cursor
+from backend.http_cache import API_CACHE_CONTROL, make_etag, not_modified_response, set_cache_headers
+from backend.schemas import Movie, MovieBrowse, MovieCreate, MovieUpdate
+from backend.services import BrowseService, MovieService
 
 router = APIRouter(prefix="/movies", tags=["Movies"])
 
 
 @router.get("/", response_model=List[Movie])
 def get_movies(
-    skip: int = Query(0, ge=0),
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    sort: str = Query("id", pattern="^(id|community)$", description="id, ou community (note moyenne des utilisateurs)"),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
+    db: Session = Depends(get_read_db)
 ):
-    """Récupérer tous les films"""
-    return MovieService.get_all(db, skip=skip, limit=limit)
+    """Récupérer tous les films (pagination par curseur, OFFSET conservé pour compatibilité)"""
+    if sort == "community":
+        movies, next_cursor = MovieService.get_page_by_community_rating(db, limit=limit, cursor=cursor)
+    elif skip and not cursor:
+        movies, next_cursor = MovieService.get_all(db, skip=skip, limit=limit), None
+    else:
+        movies, next_cursor = MovieService.get_page(db, limit=limit, cursor=cursor)
+    
+    # Le corps est déterminé par la suite ordonnée des (id, version) : 304 sans sérialisation
+    etag = make_etag("movies", [(m.id, m.version) for m in movies], next_cursor)
+    not_modified = not_modified_response(request, etag, API_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    set_cache_headers(response, etag, API_CACHE_CONTROL)
+    set_next_cursor(response, next_cursor)
+    return movies
 
 
 @router.get("/search", response_model=List[Movie])
 def search_movies(
     title: str = Query(..., min_length=1),
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
 ):
     """Rechercher des films par titre"""
-    return MovieService.search_by_title(db, title)
+    return MovieService.search_by_title(db, title, limit=limit)
 
 
 @router.get("/year/{year}", response_model=List[Movie])
-def get_movies_by_year(year: int, db: Session = Depends(get_db)):
+def get_movies_by_year(year: int, db: Session = Depends(get_read_db)):
     """Filtrer les films par année"""
     return MovieService.filter_by_year(db, year)
 
 
 @router.get("/genre/{genre}", response_model=List[Movie])
-def get_movies_by_genre(genre: str, db: Session = Depends(get_db)):
-    """Filtrer les films par genre"""
-    return MovieService.filter_by_genre(db, genre)
+def get_movies_by_genre(
+    genre: str,
+    response: Response,
+    year: Optional[int] = Query(None, description="Année de sortie"),
+    min_rating: Optional[float] = Query(None, ge=0, le=10, description="Note IMDb minimale (sur 10)"),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
+    db: Session = Depends(get_read_db)
+):
+    """Filtrer les films par genre (index normalisé, paginés si limit ou cursor est fourni)"""
+    if limit is None and cursor is None:
+        return MovieService.filter_by_genre(db, genre, year=year, min_rating=min_rating)
+    movies, next_cursor = MovieService.get_page_by_genre(
+        db, genre, year=year, min_rating=min_rating, limit=limit or 100, cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
+    return movies
+
+
+@router.get("/browse", response_model=MovieBrowse)
+def browse_movies(
+    request: Request,
+    response: Response,
+    genre: Optional[str] = Query(None, description="Genre (nom ou slug, ex. sci-fi)"),
+    year: Optional[int] = Query(None, description="Année de sortie"),
+    min_rating: Optional[float] = Query(None, ge=0, le=10, description="Note IMDb minimale (sur 10)"),
+    sort: str = Query("imdb_rating", pattern="^(imdb_rating|community|year|recent)$"),
+    limit: int = Query(24, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de next_cursor de la page précédente"),
+    facets: bool = Query(True, description="Inclure le total et les comptes par facette"),
+    db: Session = Depends(get_read_db)
+):
+    """Catalogue filtré (genre, année, note) et trié, avec comptes par facette"""
+    movies, next_cursor = BrowseService.browse(
+        db, genre=genre, year=year, min_rating=min_rating, sort=sort, limit=limit, cursor=cursor
+    )
+    counts = BrowseService.facets(db, genre=genre, year=year, min_rating=min_rating) if facets else None
+    
+    etag = make_etag("browse", [(m.id, m.version) for m in movies], next_cursor, counts)
+    not_modified = not_modified_response(request, etag, API_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    set_cache_headers(response, etag, API_CACHE_CONTROL)
+    set_next_cursor(response, next_cursor)
+    return {
+        "items": movies,
+        "next_cursor": next_cursor,
+        "total": counts["total"] if counts else None,
+        "facets": counts,
+    }
 
 
 @router.get("/{movie_id}", response_model=Movie)
-def get_movie(movie_id: int, db: Session = Depends(get_db)):
-    """Récupérer un film par son ID"""
+def get_movie(movie_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    """Récupérer un film par son ID (ETag dérivé de la version du film)"""
+    version = MovieService.get_version(db, movie_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Film non trouvé")
+    
+    etag = make_etag("movie", movie_id, version)
+    not_modified = not_modified_response(request, etag, API_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    
     movie = MovieService.get_by_id(db, movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail="Film non trouvé")
+    set_cache_headers(response, etag, API_CACHE_CONTROL)
     return movie
 
 
 @router.get("/imdb/{imdb_id}", response_model=Movie)
-def get_movie_by_imdb(imdb_id: str, db: Session = Depends(get_db)):
+def get_movie_by_imdb(imdb_id: str, db: Session = Depends(get_read_db)):
     """Récupérer un film par son ID IMDb"""
     movie = MovieService.get_by_imdb_id(db, imdb_id)
     if not movie:
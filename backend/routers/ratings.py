@@ -1,37 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from backend.database import get_db
-from backend.schemas import Rating, RatingCreate, RatingUpdate
+from typing import Any, Dict, List, Optional
+from backend.batch_write import write_batch
+from backend.config import get_settings
+from backend.database import get_db, get_read_db
+from backend.pagination import set_next_cursor
+from backend.schemas import BulkWriteResult, Rating, RatingCreate, RatingUpdate
 from backend.services import RatingService
 
+settings = get_settings()
+
 router = APIRouter(prefix="/ratings", tags=["Ratings"])
 
 
 @router.get("/", response_model=List[Rating])
 def get_ratings(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
     db: Session = Depends(get_db)
 ):
-    """Récupérer toutes les notes"""
-    return RatingService.get_all(db, skip=skip, limit=limit)
+    """Récupérer toutes les notes (pagination par curseur, OFFSET conservé pour compatibilité)"""
+    if skip and not cursor:
+        return RatingService.get_all(db, skip=skip, limit=limit)
+    ratings, next_cursor = RatingService.get_page(db, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return ratings
 
 
 @router.get("/user/{user_id}", response_model=List[Rating])
-def get_ratings_by_user(user_id: int, db: Session = Depends(get_db)):
-    """Récupérer les notes d'un utilisateur"""
-    return RatingService.get_by_user(db, user_id)
+def get_ratings_by_user(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
+    db: Session = Depends(get_db)
+):
+    """Récupérer les notes d'un utilisateur (paginées si limit ou cursor est fourni)"""
+    if limit is None and cursor is None:
+        return RatingService.get_by_user(db, user_id)
+    ratings, next_cursor = RatingService.get_page(db, limit=limit or 100, cursor=cursor, user_id=user_id)
+    set_next_cursor(response, next_cursor)
+    return ratings
 
 
 @router.get("/movie/{movie_id}", response_model=List[Rating])
-def get_ratings_by_movie(movie_id: int, db: Session = Depends(get_db)):
-    """Récupérer les notes d'un film"""
-    return RatingService.get_by_movie(db, movie_id)
+def get_ratings_by_movie(
+    movie_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
+    db: Session = Depends(get_db)
+):
+    """Récupérer les notes d'un film (paginées si limit ou cursor est fourni)"""
+    if limit is None and cursor is None:
+        return RatingService.get_by_movie(db, movie_id)
+    ratings, next_cursor = RatingService.get_page(db, limit=limit or 100, cursor=cursor, movie_id=movie_id)
+    set_next_cursor(response, next_cursor)
+    return ratings
 
 
 @router.get("/movie/{movie_id}/average")
-def get_average_rating(movie_id: int, db: Session = Depends(get_db)):
+def get_average_rating(movie_id: int, db: Session = Depends(get_read_db)):
     """Récupérer la note moyenne d'un film"""
     avg = RatingService.get_average_rating(db, movie_id)
     if avg is None:
@@ -54,6 +85,18 @@ def create_rating(rating: RatingCreate, db: Session = Depends(get_db)):
     return RatingService.create(db, rating)
 
 
+@router.post("/bulk", response_model=BulkWriteResult)
+def bulk_upsert_ratings(
+    items: List[Dict[str, Any]] = Body(..., max_length=settings.BULK_WRITE_MAX_ITEMS, description="Éléments au format de POST /"),
+    db: Session = Depends(get_db)
+):
+    """Créer ou mettre à jour des notes par lot (une transaction, un résultat par élément)"""
+    return write_batch(
+        db, RatingCreate, items, RatingService.bulk_upsert,
+        key=lambda r: (r.user_id, r.movie_id)
+    )
+
+
 @router.put("/{rating_id}", response_model=Rating)
 def update_rating(
     rating_id: int,
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
-from backend.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from backend.database import get_db, get_async_db
+from backend.pagination import set_next_cursor
 from backend.schemas import User, UserCreate, UserUpdate, UserLogin
 from backend.services import UserService
 
@@ -10,12 +12,18 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get("/", response_model=List[User])
 def get_users(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
     db: Session = Depends(get_db)
 ):
-    """Récupérer tous les utilisateurs"""
-    return UserService.get_all(db, skip=skip, limit=limit)
+    """Récupérer tous les utilisateurs (pagination par curseur, OFFSET conservé pour compatibilité)"""
+    if skip and not cursor:
+        return UserService.get_all(db, skip=skip, limit=limit)
+    users, next_cursor = UserService.get_page(db, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return users
 
 
 @router.get("/{user_id}", response_model=User)
@@ -51,9 +59,9 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login")
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Authentifier un utilisateur"""
-    user = UserService.authenticate(db, credentials.username, credentials.password)
+    user = await UserService.authenticate_async(db, credentials.username, credentials.password)
     if not user:
         raise HTTPException(status_code=401, detail="Identifiants incorrects")
     return {"message": "Connexion réussie", "user_id": user.id, "username": user.username}
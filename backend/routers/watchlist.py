@@ -1,37 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from backend.batch_write import write_batch
+from backend.config import get_settings
 from backend.database import get_db
-from backend.schemas import Watchlist, WatchlistCreate, WatchlistUpdate
+from backend.pagination import set_next_cursor
+from backend.schemas import BulkWriteResult, Watchlist, WatchlistCreate, WatchlistUpdate
 from backend.services import WatchlistService
 
+settings = get_settings()
+
 router = APIRouter(prefix="/watchlist", tags=["Watchlist"])
 
 
 @router.get("/", response_model=List[Watchlist])
 def get_watchlist(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
     db: Session = Depends(get_db)
 ):
-    """Récupérer toutes les entrées de watchlist"""
-    return WatchlistService.get_all(db, skip=skip, limit=limit)
+    """Récupérer toutes les entrées de watchlist (pagination par curseur, OFFSET conservé pour compatibilité)"""
+    if skip and not cursor:
+        return WatchlistService.get_all(db, skip=skip, limit=limit)
+    items, next_cursor = WatchlistService.get_page(db, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return items
 
 
 @router.get("/user/{user_id}", response_model=List[Watchlist])
 def get_watchlist_by_user(
     user_id: int,
+    response: Response,
     status: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
     db: Session = Depends(get_db)
 ):
-    """Récupérer la watchlist d'un utilisateur (filtrable par statut)"""
-    return WatchlistService.get_by_user(db, user_id, status)
+    """Récupérer la watchlist d'un utilisateur (filtrable par statut, paginée si limit ou cursor est fourni)"""
+    if limit is None and cursor is None:
+        return WatchlistService.get_by_user(db, user_id, status)
+    items, next_cursor = WatchlistService.get_page(db, limit=limit or 100, cursor=cursor, user_id=user_id, status=status)
+    set_next_cursor(response, next_cursor)
+    return items
 
 
 @router.get("/movie/{movie_id}", response_model=List[Watchlist])
-def get_watchlist_by_movie(movie_id: int, db: Session = Depends(get_db)):
-    """Récupérer les utilisateurs qui ont ajouté un film à leur watchlist"""
-    return WatchlistService.get_by_movie(db, movie_id)
+def get_watchlist_by_movie(
+    movie_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
+    db: Session = Depends(get_db)
+):
+    """Récupérer les utilisateurs qui ont ajouté un film à leur watchlist (paginés si limit ou cursor est fourni)"""
+    if limit is None and cursor is None:
+        return WatchlistService.get_by_movie(db, movie_id)
+    items, next_cursor = WatchlistService.get_page(db, limit=limit or 100, cursor=cursor, movie_id=movie_id)
+    set_next_cursor(response, next_cursor)
+    return items
 
 
 @router.get("/{watchlist_id}", response_model=Watchlist)
@@ -49,6 +77,19 @@ def add_to_watchlist(watchlist: WatchlistCreate, db: Session = Depends(get_db)):
     return WatchlistService.create(db, watchlist)
 
 
+@router.post("/bulk", response_model=BulkWriteResult)
+def bulk_upsert_watchlist(
+    items: List[Dict[str, Any]] = Body(..., max_length=settings.BULK_WRITE_MAX_ITEMS, description="Éléments au format de POST /"),
+    db: Session = Depends(get_db)
+):
+    """Ajouter ou mettre à jour des entrées de watchlist par lot (une transaction, un résultat par élément)"""
+    return write_batch(
+        db, WatchlistCreate, items, WatchlistService.bulk_upsert,
+        key=lambda w: (w.user_id, w.movie_id),
+        after_commit=WatchlistService.invalidate_entries
+    )
+
+
 @router.put("/{watchlist_id}", response_model=Watchlist)
 def update_watchlist(
     watchlist_id: int,
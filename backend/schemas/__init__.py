@@ -1,13 +1,15 @@
 from .user import User, UserCreate, UserUpdate, UserLogin
-from .movie import Movie, MovieCreate, MovieUpdate
+from .movie import Movie, MovieCreate, MovieUpdate, MovieBrowse, MovieFacets
 from .rating import Rating, RatingCreate, RatingUpdate
-from .comment import Comment, CommentCreate, CommentUpdate
+from .comment import Comment, CommentCreate, CommentUpdate, CommentView
 from .watchlist import Watchlist, WatchlistCreate, WatchlistUpdate, WatchlistStatus
+from .bulk import BulkItemResult, BulkWriteResult
 
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserLogin",
-    "Movie", "MovieCreate", "MovieUpdate",
+    "Movie", "MovieCreate", "MovieUpdate", "MovieBrowse", "MovieFacets",
     "Rating", "RatingCreate", "RatingUpdate",
-    "Comment", "CommentCreate", "CommentUpdate",
-    "Watchlist", "WatchlistCreate", "WatchlistUpdate", "WatchlistStatus"
+    "Comment", "CommentCreate", "CommentUpdate", "CommentView",
+    "Watchlist", "WatchlistCreate", "WatchlistUpdate", "WatchlistStatus",
+    "BulkItemResult", "BulkWriteResult"
 ]
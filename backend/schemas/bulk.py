@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class BulkItemResult(BaseModel):
+    index: int  # Position de l'élément dans la requête
+    status: str  # created, updated, invalid, not_found, duplicate, failed
+    id: Optional[int] = None
+    errors: List[str] = []
+
+
+class BulkWriteResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[BulkItemResult]
@@ -23,3 +23,14 @@ class Comment(CommentBase):
     
     class Config:
         from_attributes = True
+
+
+class CommentView(BaseModel):
+    """Projection légère pour l'affichage : auteur joint, sans objets ORM"""
+    id: int
+    username: str
+    content: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
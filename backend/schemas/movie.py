@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -30,6 +30,37 @@ class MovieUpdate(BaseModel):
 class Movie(MovieBase):
     id: int
     created_at: datetime
+    imdb_rating: Optional[float] = None
     
     class Config:
         from_attributes = True
+
+
+class GenreFacet(BaseModel):
+    slug: str
+    name: str
+    count: int
+
+
+class YearFacet(BaseModel):
+    year: int
+    count: int
+
+
+class RatingFacet(BaseModel):
+    min_rating: float
+    count: int
+
+
+class MovieFacets(BaseModel):
+    """Comptes par valeur de filtre, chaque facette ignorant son propre filtre"""
+    genres: List[GenreFacet]
+    years: List[YearFacet]
+    ratings: List[RatingFacet]
+
+
+class MovieBrowse(BaseModel):
+    items: List[Movie]
+    total: Optional[int] = None  # Avec facets seulement
+    next_cursor: Optional[str] = None
+    facets: Optional[MovieFacets] = None
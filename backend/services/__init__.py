@@ -3,5 +3,8 @@ from .movie_service import MovieService
 from .rating_service import RatingService
 from .comment_service import CommentService
 from .watchlist_service import WatchlistService
+from .genre_service import GenreService
+from .browse_service import BrowseService
+from .ranking_service import RankingService
 
-__all__ = ["UserService", "MovieService", "RatingService", "CommentService", "WatchlistService"]
+__all__ = ["UserService", "MovieService", "RatingService", "CommentService", "WatchlistService", "GenreService", "BrowseService", "RankingService"]
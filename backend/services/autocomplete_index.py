@@ -0,0 +1,139 @@
+"""
+Index d'auto-complétion en mémoire pour la recherche du header
+Tableau trié de (mot, movie_id) : une recherche de préfixe est une bissection,
+sans aller-retour base de données. Construit au démarrage depuis la table
+movies, puis tenu à jour par MovieService (création, mise à jour, suppression).
+"""
+import asyncio
+import heapq
+import logging
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple
+from backend.config import get_settings
+from backend.database import SessionLocal
+from backend.models import Movie
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def normalize(value: str) -> str:
+    """Minuscules, sans accents"""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(value: str) -> List[str]:
+    return re.findall(r"\w+", normalize(value))
+
+
+class AutocompleteIndex:
+    """Index de préfixes sur les mots des titres"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: List[Tuple[str, int]] = []
+        self._movies: Dict[int, dict] = {}
+        self._tokens: Dict[int, List[str]] = {}
+        self.ready = False
+
+    @staticmethod
+    def _payload(movie: Movie) -> dict:
+        """Format renvoyé par /api/search/movies"""
+        return {
+            "id": movie.id,
+            "title": movie.title,
+            "year": movie.year,
+            "poster_url": movie.poster_url,
+            "imdb_id": movie.imdb_id,
+            "plot": movie.plot,
+            "genres": movie.genres,
+        }
+
+    def build(self, movies: Iterable[Movie]):
+        """(Re)construire l'index complet"""
+        entries, payloads, tokens = [], {}, {}
+        for movie in movies:
+            words = sorted(set(tokenize(movie.title)))
+            payloads[movie.id] = self._payload(movie)
+            tokens[movie.id] = words
+            entries.extend((word, movie.id) for word in words)
+        entries.sort()
+        with self._lock:
+            self._entries, self._movies, self._tokens = entries, payloads, tokens
+            self.ready = True
+
+    def build_from_db(self):
+        with SessionLocal() as db:
+            self.build(db.query(Movie).all())
+
+    def upsert(self, movie: Movie):
+        """Ajouter ou remplacer un film"""
+        with self._lock:
+            self._remove_locked(movie.id)
+            words = sorted(set(tokenize(movie.title)))
+            for word in words:
+                insort(self._entries, (word, movie.id))
+            self._movies[movie.id] = self._payload(movie)
+            self._tokens[movie.id] = words
+
+    def remove(self, movie_id: int):
+        with self._lock:
+            self._remove_locked(movie_id)
+
+    def _remove_locked(self, movie_id: int):
+        for word in self._tokens.pop(movie_id, []):
+            i = bisect_left(self._entries, (word, movie_id))
+            if i < len(self._entries) and self._entries[i] == (word, movie_id):
+                del self._entries[i]
+        self._movies.pop(movie_id, None)
+
+    def _prefix_ids(self, prefix: str) -> List[int]:
+        start = bisect_left(self._entries, (prefix, -1))
+        ids = []
+        for word, movie_id in self._entries[start:]:
+            if not word.startswith(prefix):
+                break
+            ids.append(movie_id)
+        return ids
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """Films dont chaque mot de la requête préfixe un mot du titre"""
+        words = tokenize(query)
+        if not words:
+            return []
+        normalized_query = " ".join(words)
+
+        with self._lock:
+            # Le mot le plus long est le plus sélectif
+            pivot = max(words, key=len)
+            others = [w for w in words if w != pivot]
+            candidates = set(self._prefix_ids(pivot))
+
+            matches = []
+            for movie_id in candidates:
+                movie_words = self._tokens[movie_id]
+                if all(any(mw.startswith(w) for mw in movie_words) for w in others):
+                    matches.append(self._movies[movie_id])
+
+        def rank(payload: dict):
+            title = " ".join(tokenize(payload["title"]))
+            return (not title.startswith(normalized_query), len(title), title, payload["id"])
+
+        return heapq.nsmallest(limit, matches, key=rank)
+
+    async def run_rebuilder(self):
+        """Reconstruction périodique : rattrape les écritures des autres workers et des imports"""
+        while True:
+            await asyncio.sleep(settings.AUTOCOMPLETE_REBUILD_INTERVAL)
+            try:
+                await asyncio.to_thread(self.build_from_db)
+            except Exception:
+                logger.exception("Erreur reconstruction auto-complétion")
+
+
+# Instance partagée par le processus
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,148 @@
+"""
+Navigation à facettes dans le catalogue : genre × année × note IMDb, quatre tris
+Une page de films (pagination par curseur) et, pour chaque facette, le nombre
+de films par valeur en tenant compte des autres filtres (la facette "genre"
+ignore le genre choisi, etc.). Les comptes passent par les index composites
+movie_genres (genre_id, movie_id) et movies (year, imdb_rating) ; ils sont mis
+en cache quelques secondes par combinaison de filtres.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import case, false, func
+from sqlalchemy.orm import Session
+from backend.cache import TTLCache, MISSING
+from backend.config import get_settings
+from backend.models import Genre, Movie, MovieRatingStats, movie_genres
+from backend.pagination import paginate
+from backend.services.genre_service import GenreService, genre_slug
+from backend.services.movie_service import COMMUNITY_RATING_ORDER, IMDB_RATING_ORDER
+
+settings = get_settings()
+
+# Seuils de la facette "note IMDb minimale" (sur 10)
+RATING_THRESHOLDS = (9, 8, 7, 6, 5)
+
+# Tri : (ordre keyset, valeurs de curseur d'une ligne, jointure de l'agrégat communautaire)
+SORTS: Dict[str, Tuple[list, Callable, bool]] = {
+    "imdb_rating": (IMDB_RATING_ORDER, lambda m: [m.imdb_rating is None, m.imdb_rating, m.title, m.id], False),
+    "community": (COMMUNITY_RATING_ORDER, lambda row: [row.average is None, row.average, row.Movie.id], True),
+    "year": ([(Movie.year, True), (Movie.id, True)], lambda m: [m.year, m.id], False),
+    "recent": ([(Movie.id, True)], lambda m: [m.id], False),
+}
+
+SORT_LABELS = {
+    "imdb_rating": "note IMDb",
+    "community": "note des utilisateurs",
+    "year": "année",
+    "recent": "ajout récent",
+}
+
+facet_cache = TTLCache(
+    max_size=settings.BROWSE_FACETS_CACHE_MAX_SIZE,
+    ttl=settings.BROWSE_FACETS_CACHE_TTL,
+    name="browse_facets"
+)
+
+
+def _filter(query, genre_id: Optional[int] = None, year: Optional[int] = None, min_rating: Optional[float] = None,
+            genre: Optional[str] = None):
+    """Appliquer les filtres à une requête dont l'entité principale est Movie"""
+    if genre is not None:
+        if genre_id is None:
+            return query.filter(false())
+        query = query.join(movie_genres, movie_genres.c.movie_id == Movie.id).filter(movie_genres.c.genre_id == genre_id)
+    if year is not None:
+        query = query.filter(Movie.year == year)
+    if min_rating is not None:
+        query = query.filter(Movie.imdb_rating >= min_rating)
+    return query
+
+
+class BrowseService:
+    """Service de navigation à facettes"""
+
+    @staticmethod
+    def _genre_id(db: Session, genre: Optional[str]) -> Optional[int]:
+        if genre is None:
+            return None
+        genre_row = GenreService.get_by_slug(db, genre)
+        return genre_row.id if genre_row else None
+
+    @staticmethod
+    def browse(
+        db: Session,
+        genre: Optional[str] = None,
+        year: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        sort: str = "imdb_rating",
+        limit: int = 24,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Movie], Optional[str]]:
+        """Page de films filtrés et triés (pagination par curseur)"""
+        order, key, with_average = SORTS[sort]
+        if with_average:
+            query = db.query(Movie, MovieRatingStats.average).outerjoin(
+                MovieRatingStats, MovieRatingStats.movie_id == Movie.id
+            )
+        else:
+            query = db.query(Movie)
+        genre_id = BrowseService._genre_id(db, genre)
+        query = _filter(query, genre_id, year, min_rating, genre=genre)
+
+        rows, next_cursor = paginate(query, order, key, limit, cursor)
+        if with_average:
+            return [row.Movie for row in rows], next_cursor
+        return rows, next_cursor
+
+    @staticmethod
+    def facets(
+        db: Session,
+        genre: Optional[str] = None,
+        year: Optional[int] = None,
+        min_rating: Optional[float] = None
+    ) -> dict:
+        """Total et comptes par genre, par année et par seuil de note (en cache quelques secondes)"""
+        cache_key = (genre_slug(genre) if genre else None, year, min_rating)
+        cached = facet_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+
+        genre_id = BrowseService._genre_id(db, genre)
+
+        # Genres : l'association suffit tant qu'aucun filtre ne porte sur movies
+        genre_query = db.query(Genre.slug, Genre.name, func.count().label("count")).join(
+            movie_genres, movie_genres.c.genre_id == Genre.id
+        )
+        if year is not None or min_rating is not None:
+            genre_query = _filter(genre_query.join(Movie, Movie.id == movie_genres.c.movie_id), year=year, min_rating=min_rating)
+        genres = [
+            {"slug": row.slug, "name": row.name, "count": row.count}
+            for row in genre_query.group_by(Genre.id, Genre.slug, Genre.name)
+            .order_by(func.count().desc(), Genre.name)
+        ]
+
+        year_query = _filter(db.query(Movie.year, func.count().label("count")), genre_id, min_rating=min_rating, genre=genre)
+        years = [
+            {"year": row.year, "count": row.count}
+            for row in year_query.group_by(Movie.year).order_by(Movie.year.desc())
+        ]
+
+        # Seuils de note et total en une seule agrégation
+        thresholds = [func.sum(case((Movie.imdb_rating >= t, 1), else_=0)) for t in RATING_THRESHOLDS]
+        selected = func.sum(case((Movie.imdb_rating >= min_rating, 1), else_=0)) if min_rating is not None else func.count()
+        counts = _filter(db.query(selected, *thresholds), genre_id, year, genre=genre).one()
+
+        result = {
+            "total": counts[0] or 0,
+            "genres": genres,
+            "years": years,
+            "ratings": [
+                {"min_rating": float(t), "count": count or 0} for t, count in zip(RATING_THRESHOLDS, counts[1:])
+            ],
+        }
+        facet_cache.set(cache_key, result)
+        return result
+
+    @staticmethod
+    def invalidate():
+        """Oublier les comptes en cache (écriture sur le catalogue dans ce processus)"""
+        facet_cache.clear()
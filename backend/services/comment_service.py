@@ -1,7 +1,10 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from backend.models import Comment
-from backend.schemas import CommentCreate, CommentUpdate
+from datetime import datetime
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional, Tuple
+from backend.models import Comment, User
+from backend.schemas import CommentCreate, CommentUpdate, CommentView
+from backend.pagination import paginate
 
 
 class CommentService:
@@ -11,6 +14,24 @@ class CommentService:
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Comment]:
         return db.query(Comment).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_page(
+        db: Session,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        user_id: Optional[int] = None,
+        movie_id: Optional[int] = None
+    ) -> Tuple[List[Comment], Optional[str]]:
+        """Page de commentaires, les plus récents d'abord"""
+        query = db.query(Comment)
+        if user_id is not None:
+            query = query.filter(Comment.user_id == user_id)
+        if movie_id is not None:
+            query = query.filter(Comment.movie_id == movie_id)
+        # created_at est posé à l'insertion : l'ordre des id est l'ordre chronologique,
+        # et la clé primaire évite de comparer des dates au format variable sous SQLite
+        return paginate(query, [(Comment.id, True)], lambda c: [c.id], limit, cursor)
+    
     @staticmethod
     def get_by_id(db: Session, comment_id: int) -> Optional[Comment]:
         return db.query(Comment).filter(Comment.id == comment_id).first()
@@ -23,6 +44,18 @@ class CommentService:
         db.refresh(db_comment)
         return db_comment
     
+    @staticmethod
+    def bulk_create(db: Session, comments: List[CommentCreate]) -> List[Tuple[int, bool]]:
+        """
+        INSERT multi-lignes d'un lot de commentaires.
+        Retourne (id, True) pour chaque commentaire, dans l'ordre. Ne valide pas la transaction.
+        """
+        rows = db.execute(
+            insert(Comment.__table__).returning(Comment.id, sort_by_parameter_order=True),
+            [c.model_dump() for c in comments]
+        )
+        return [(row.id, True) for row in rows]
+    
     @staticmethod
     def update(db: Session, comment_id: int, comment: CommentUpdate) -> Optional[Comment]:
         db_comment = CommentService.get_by_id(db, comment_id)
@@ -47,4 +80,40 @@ class CommentService:
     
     @staticmethod
     def get_by_movie(db: Session, movie_id: int) -> List[Comment]:
-        return db.query(Comment).filter(Comment.movie_id == movie_id).order_by(Comment.created_at.desc()).all()
+        # Auteurs chargés dans la même requête (pas un SELECT users par commentaire)
+        return (
+            db.query(Comment)
+            .options(joinedload(Comment.user))
+            .filter(Comment.movie_id == movie_id)
+            .order_by(Comment.created_at.desc())
+            .all()
+        )
+    
+    @staticmethod
+    def get_movie_stamp(db: Session, movie_id: int) -> Tuple[int, Optional[int], Optional[datetime]]:
+        """
+        (nombre, dernier id, dernière modification) des commentaires d'un film :
+        change à chaque ajout, suppression ou modification
+        """
+        count, last_id, last_update = (
+            db.query(func.count(Comment.id), func.max(Comment.id), func.max(Comment.updated_at))
+            .filter(Comment.movie_id == movie_id)
+            .one()
+        )
+        return count, last_id, last_update
+    
+    @staticmethod
+    def get_views_by_movie(
+        db: Session,
+        movie_id: int,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[CommentView], Optional[str]]:
+        """Page de commentaires d'un film avec le nom de l'auteur, en une requête"""
+        query = (
+            db.query(Comment.id, User.username, Comment.content, Comment.created_at)
+            .join(User, User.id == Comment.user_id)
+            .filter(Comment.movie_id == movie_id)
+        )
+        rows, next_cursor = paginate(query, [(Comment.id, True)], lambda r: [r.id], limit, cursor)
+        return [CommentView.model_validate(row) for row in rows], next_cursor
@@ -0,0 +1,134 @@
+"""
+Index normalisé des genres (tables genres et movie_genres)
+Movie.genres reste la liste texte affichée ("Action, Drama") ; la recherche
+par genre passe par l'association indexée (genre_id, movie_id) au lieu d'un
+ILIKE '%genre%' qui parcourt toute la table movies.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import delete, insert, select
+from backend.database import dialect_insert
+from backend.models import Genre, Movie, movie_genres
+
+logger = logging.getLogger(__name__)
+
+# Lignes lues par lot lors de la reconstruction de l'index
+REBUILD_BATCH_SIZE = 5000
+
+
+def genre_slug(name: str) -> str:
+    """Clé de recherche d'un genre : "Sci-Fi" et "sci-fi" désignent le même genre"""
+    return "-".join(name.strip().lower().split())
+
+
+def parse_genres(value: Optional[str]) -> List[str]:
+    """"Action, Drama" -> ["Action", "Drama"] (sans doublons ni valeur N/A d'OMDb)"""
+    names = {}
+    for name in (value or "").split(","):
+        name = name.strip()
+        if name and name != "N/A":
+            names.setdefault(genre_slug(name), name)
+    return list(names.values())
+
+
+class GenreService:
+    """Service de l'index des genres"""
+
+    @staticmethod
+    def _genre_ids(db, names: Iterable[str]) -> Dict[str, int]:
+        """Ids des genres par slug, en créant les genres absents (ON CONFLICT DO NOTHING)"""
+        by_slug = {genre_slug(name): name for name in names}
+        if not by_slug:
+            return {}
+        table = Genre.__table__
+        # Session : moteur lié ; Connection : elle-même (seul le dialecte compte)
+        insert_stmt = dialect_insert(db.get_bind() if hasattr(db, "get_bind") else db)
+        db.execute(
+            insert_stmt(table)
+            .values([{"name": name, "slug": slug} for slug, name in by_slug.items()])
+            .on_conflict_do_nothing(index_elements=[table.c.slug])
+        )
+        rows = db.execute(select(table.c.slug, table.c.id).where(table.c.slug.in_(list(by_slug))))
+        return {row.slug: row.id for row in rows}
+
+    @staticmethod
+    def sync(db, genres_by_movie: Dict[int, Optional[str]]):
+        """
+        Réécrire les associations des films donnés depuis leur liste texte.
+        Accepte une Session ou une Connection ; ne valide pas la transaction.
+        """
+        if not genres_by_movie:
+            return
+        parsed = {movie_id: parse_genres(value) for movie_id, value in genres_by_movie.items()}
+        genre_ids = GenreService._genre_ids(db, {name for names in parsed.values() for name in names})
+
+        db.execute(delete(movie_genres).where(movie_genres.c.movie_id.in_(list(parsed))))
+        links = [
+            {"movie_id": movie_id, "genre_id": genre_ids[slug]}
+            for movie_id, names in parsed.items()
+            for slug in dict.fromkeys(genre_slug(name) for name in names)
+        ]
+        if links:
+            db.execute(insert(movie_genres), links)
+
+    @staticmethod
+    def sync_movie(db, movie: Movie):
+        """Réindexer les genres d'un film (id attribué : après flush)"""
+        GenreService.sync(db, {movie.id: movie.genres})
+
+    @staticmethod
+    def unlink(db, movie_id: int):
+        """Retirer un film de l'index (SQLite n'applique pas ON DELETE CASCADE par défaut)"""
+        db.execute(delete(movie_genres).where(movie_genres.c.movie_id == movie_id))
+
+    @staticmethod
+    def get_by_slug(db, genre: str) -> Optional[Genre]:
+        return db.query(Genre).filter(Genre.slug == genre_slug(genre)).first()
+
+    @staticmethod
+    def ensure_index(bind):
+        """
+        Indexer les films qui ont des genres mais aucune ligne d'association
+        (base existante, ou films ajoutés sans passer par MovieService)
+        """
+        indexed = 0
+        with bind.begin() as conn:
+            last_id = 0
+            while True:
+                rows = conn.execute(
+                    select(Movie.id, Movie.genres)
+                    .where(
+                        Movie.id > last_id,
+                        Movie.genres.is_not(None),
+                        Movie.genres != "",
+                        ~select(movie_genres.c.movie_id).where(movie_genres.c.movie_id == Movie.id).exists()
+                    )
+                    .order_by(Movie.id)
+                    .limit(REBUILD_BATCH_SIZE)
+                ).all()
+                if not rows:
+                    break
+                GenreService.sync(conn, {row.id: row.genres for row in rows})
+                indexed += len(rows)
+                last_id = rows[-1].id
+        if indexed:
+            logger.info("Index des genres complété", extra={"movies": indexed})
+
+    @staticmethod
+    def rebuild(bind):
+        """Reconstruire tout l'index depuis movies.genres"""
+        with bind.begin() as conn:
+            conn.execute(delete(movie_genres))
+            last_id = 0
+            while True:
+                rows = conn.execute(
+                    select(Movie.id, Movie.genres)
+                    .where(Movie.id > last_id)
+                    .order_by(Movie.id)
+                    .limit(REBUILD_BATCH_SIZE)
+                ).all()
+                if not rows:
+                    break
+                GenreService.sync(conn, {row.id: row.genres for row in rows})
+                last_id = rows[-1].id
+        logger.info("Index des genres reconstruit")
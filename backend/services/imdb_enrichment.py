@@ -0,0 +1,61 @@
+"""
+Enrichissement concurrent des films avec leur note IMDb
+Les appels OMDb sont lancés en parallèle, bornés par un sémaphore ; un appel
+en échec est journalisé et n'empêche pas les autres d'aboutir.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+from backend.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class ImdbEnrichmentService:
+    """Service de récupération concurrente des notes IMDb"""
+
+    @staticmethod
+    async def fetch_ratings(
+        imdb_ids: Iterable[str],
+        fetch: Callable[[str], Awaitable[Optional[float]]],
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Optional[float]]:
+        """
+        Récupère les notes de plusieurs films en parallèle
+
+        Args:
+            imdb_ids: IDs IMDb à résoudre (les doublons sont ignorés)
+            fetch: coroutine qui récupère la note d'un ID IMDb
+            concurrency: nombre maximum d'appels simultanés
+
+        Returns:
+            Dict imdb_id -> note pour chaque ID (None si l'appel a échoué)
+        """
+        ids = list(dict.fromkeys(i for i in imdb_ids if i))
+        if not ids:
+            return {}
+
+        semaphore = asyncio.Semaphore(concurrency or settings.IMDB_ENRICH_CONCURRENCY)
+
+        async def bounded_fetch(imdb_id: str) -> Optional[float]:
+            async with semaphore:
+                return await fetch(imdb_id)
+
+        def log_failure(task: asyncio.Task):
+            # Récupérer l'exception : sinon asyncio signale "Task exception was never retrieved"
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(
+                    "Échec de récupération de la note IMDb",
+                    extra={"imdb_id": tasks[task], "error": repr(task.exception())}
+                )
+
+        tasks = {asyncio.create_task(bounded_fetch(i)): i for i in ids}
+        for task in tasks:
+            task.add_done_callback(log_failure)
+        await asyncio.wait(tasks.keys())
+
+        return {
+            imdb_id: task.result() if not task.cancelled() and task.exception() is None else None
+            for task, imdb_id in tasks.items()
+        }
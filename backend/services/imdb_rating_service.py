@@ -0,0 +1,186 @@
+"""
+Notes IMDb persistées en base
+La note est stockée sur la ligne `movies` avec sa date de récupération ;
+une tâche de fond rafraîchit les notes absentes ou périmées, ce qui garde
+OMDb hors du chemin des requêtes de pages.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import and_, case, or_, func
+from sqlalchemy.orm import Session
+from backend.cache import TTLCache
+from backend.config import get_settings
+from backend.database import SessionLocal
+from backend.http_client import get_http_client
+from backend.models import Movie
+from backend.services.imdb_enrichment import ImdbEnrichmentService
+from backend.services.movie_fetcher import omdb_limiter
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Notes déjà demandées à OMDb (les "N/A" et échecs sont gardés moins longtemps)
+imdb_rating_cache = TTLCache(
+    max_size=settings.EXTERNAL_CACHE_MAX_SIZE,
+    ttl=settings.EXTERNAL_CACHE_TTL,
+    negative_ttl=settings.EXTERNAL_CACHE_NEGATIVE_TTL,
+    name="imdb_rating"
+)
+
+
+class ImdbRatingService:
+    """Service pour la récupération et le stockage des notes IMDb"""
+
+    @staticmethod
+    def parse_rating(value) -> Optional[float]:
+        """Convertir un imdbRating OMDb ("7.8", "N/A") en float"""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    async def fetch_rating(imdb_id: str) -> Optional[float]:
+        """Récupère la note IMDb depuis l'API OMDB (via le cache)"""
+        if not imdb_id:
+            return None
+        return await imdb_rating_cache.get_or_load(
+            imdb_id, lambda: ImdbRatingService._fetch_rating_from_omdb(imdb_id)
+        )
+
+    @staticmethod
+    async def _fetch_rating_from_omdb(imdb_id: str) -> Optional[float]:
+        """Appel OMDb ; None si la note est absente ou en cas d'erreur"""
+        if not settings.OMDB_API_KEY:
+            logger.warning("OMDB_API_KEY manquante dans .env")
+            return None
+
+        try:
+            logger.debug("Récupération de la note IMDb", extra={"imdb_id": imdb_id})
+            await omdb_limiter.acquire()
+            response = await get_http_client().get(
+                settings.OMDB_BASE_URL,
+                params={"i": imdb_id, "apikey": settings.OMDB_API_KEY}
+            )
+            if response.status_code != 200:
+                logger.warning("Erreur OMDb", extra={"imdb_id": imdb_id, "status": response.status_code})
+                return None
+
+            data = response.json()
+            if data.get("Response") == "True":
+                return ImdbRatingService.parse_rating(data.get("imdbRating"))
+            logger.info("Note IMDb absente", extra={"imdb_id": imdb_id, "error": data.get("Error")})
+        except Exception as e:
+            logger.warning("Erreur OMDb", extra={"imdb_id": imdb_id, "error": str(e)})
+
+        return None
+
+    @staticmethod
+    def _thresholds():
+        """(seuil des notes présentes, seuil des notes absentes) : avant ces dates, on redemande"""
+        now = datetime.utcnow()
+        return (
+            now - timedelta(hours=settings.IMDB_RATING_TTL_HOURS),
+            now - timedelta(hours=settings.IMDB_RATING_NEGATIVE_TTL_HOURS),
+        )
+
+    @staticmethod
+    def is_stale(movie: Movie) -> bool:
+        """La note doit-elle être récupérée à nouveau ?"""
+        # Lignes antérieures à imdb_rating_checked_at : la date de récupération en tient lieu
+        checked_at = movie.imdb_rating_checked_at or movie.imdb_rating_fetched_at
+        if checked_at is None:
+            return True
+        threshold, negative_threshold = ImdbRatingService._thresholds()
+        return checked_at < (threshold if movie.imdb_rating is not None else negative_threshold)
+
+    @staticmethod
+    def store_ratings(db: Session, ratings: Dict[str, Optional[float]]) -> int:
+        """
+        Enregistre les notes récupérées ; les échecs (None) sont datés sans toucher à la note,
+        pour être retentés après IMDB_RATING_NEGATIVE_TTL_HOURS seulement
+        """
+        now = datetime.utcnow()
+        stored = 0
+        failed = [imdb_id for imdb_id, rating in ratings.items() if rating is None]
+        for imdb_id, rating in ratings.items():
+            if rating is None:
+                continue
+            db.query(Movie).filter(Movie.imdb_id == imdb_id).update(
+                {
+                    Movie.imdb_rating: rating,
+                    Movie.imdb_rating_fetched_at: now,
+                    Movie.imdb_rating_checked_at: now,
+                    # Version (fragments, ETag) changée seulement si la note change : un rafraîchissement
+                    # qui confirme la note n'invalide rien (le SET lit les valeurs d'avant la mise à jour)
+                    Movie.version: case(
+                        (Movie.imdb_rating.is_distinct_from(rating), func.coalesce(Movie.version, 0) + 1),
+                        else_=Movie.version
+                    ),
+                },
+                synchronize_session=False
+            )
+            stored += 1
+        if failed:
+            db.query(Movie).filter(Movie.imdb_id.in_(failed)).update(
+                {Movie.imdb_rating_checked_at: now}, synchronize_session=False
+            )
+        db.commit()
+        return stored
+
+    @staticmethod
+    def get_stale_imdb_ids(db: Session, limit: int) -> list:
+        """
+        IDs IMDb jamais demandés, dont la note a dépassé le TTL, ou dont l'absence de note
+        a dépassé le TTL négatif (les demandes les plus anciennes d'abord)
+        """
+        threshold, negative_threshold = ImdbRatingService._thresholds()
+        checked_at = func.coalesce(Movie.imdb_rating_checked_at, Movie.imdb_rating_fetched_at)
+        rows = (
+            db.query(Movie.imdb_id)
+            .filter(or_(
+                checked_at.is_(None),
+                and_(Movie.imdb_rating.isnot(None), checked_at < threshold),
+                and_(Movie.imdb_rating.is_(None), checked_at < negative_threshold),
+            ))
+            .order_by(checked_at.isnot(None), checked_at)
+            .limit(limit)
+            .all()
+        )
+        return [row[0] for row in rows]
+
+    @staticmethod
+    async def refresh_stale(limit: Optional[int] = None) -> int:
+        """Rafraîchit un lot de notes périmées ; retourne le nombre de notes stockées"""
+        batch = limit or settings.IMDB_REFRESH_BATCH
+
+        def load_ids():
+            with SessionLocal() as db:
+                return ImdbRatingService.get_stale_imdb_ids(db, batch)
+
+        def save(ratings):
+            with SessionLocal() as db:
+                return ImdbRatingService.store_ratings(db, ratings)
+
+        imdb_ids = await asyncio.to_thread(load_ids)
+        if not imdb_ids:
+            return 0
+
+        ratings = await ImdbEnrichmentService.fetch_ratings(imdb_ids, ImdbRatingService.fetch_rating)
+        return await asyncio.to_thread(save, ratings)
+
+    @staticmethod
+    async def run_refresher():
+        """Boucle de fond lancée au démarrage de l'application"""
+        while True:
+            try:
+                stored = await ImdbRatingService.refresh_stale()
+                if stored:
+                    logger.info("Notes IMDb rafraîchies", extra={"count": stored})
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erreur rafraîchissement IMDb")
+            await asyncio.sleep(settings.IMDB_REFRESH_INTERVAL)
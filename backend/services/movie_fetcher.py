@@ -1,14 +1,48 @@
 """
 Service pour récupérer les films depuis les APIs OMDB et TMDb
 Utilise OMDB pour les données texte et TMDb pour les images HD
+
+L'API principale est asynchrone (client HTTP partagé, appels OMDb et TMDb
+lancés en parallèle, débit limité par token bucket). Les méthodes synchrones
+sont de simples enveloppes pour les scripts (init_db) ; ne pas les appeler
+depuis une route async.
 """
-import requests
+import asyncio
+import logging
 import os
-import time
 from typing import Optional, Dict, List
+from backend.cache import TTLCache
 from backend.config import get_settings
+from backend.http_client import get_http_client, close_http_client
+from backend.rate_limiter import TokenBucket
+from backend.services.genre_service import parse_genres
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Réponses OMDb / TMDb par ID IMDb, et résultats d'auto-complétion par requête
+omdb_cache = TTLCache(
+    max_size=settings.EXTERNAL_CACHE_MAX_SIZE,
+    ttl=settings.EXTERNAL_CACHE_TTL,
+    negative_ttl=settings.EXTERNAL_CACHE_NEGATIVE_TTL,
+    name="omdb"
+)
+tmdb_cache = TTLCache(
+    max_size=settings.EXTERNAL_CACHE_MAX_SIZE,
+    ttl=settings.EXTERNAL_CACHE_TTL,
+    negative_ttl=settings.EXTERNAL_CACHE_NEGATIVE_TTL,
+    name="tmdb"
+)
+search_cache = TTLCache(
+    max_size=settings.EXTERNAL_CACHE_MAX_SIZE,
+    ttl=settings.SEARCH_CACHE_TTL,
+    negative_ttl=settings.EXTERNAL_CACHE_NEGATIVE_TTL,
+    name="omdb_search"
+)
+
+# Débit partagé par tout le processus, quel que soit le nombre d'appels concurrents
+omdb_limiter = TokenBucket(settings.OMDB_RATE_LIMIT, settings.OMDB_RATE_BURST)
+tmdb_limiter = TokenBucket(settings.TMDB_RATE_LIMIT, settings.TMDB_RATE_BURST)
 
 
 class MovieFetcherService:
@@ -18,106 +52,128 @@ class MovieFetcherService:
         self.omdb_key = settings.OMDB_API_KEY  # Votre clé: 2b098366
         self.tmdb_key = os.getenv("TMDB_API_KEY", "1b3f624058e45e0bc6160e397b1336e3")  # Votre clé TMDb
     
-    def fetch_movie_by_imdb_id(self, imdb_id: str) -> Optional[Dict]:
+    @staticmethod
+    def _run_sync(coro):
+        """Exécuter une coroutine depuis du code synchrone (scripts, init_db)"""
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await close_http_client()
+        return asyncio.run(runner())
+    
+    async def fetch_movie_by_imdb_id_async(self, imdb_id: str) -> Optional[Dict]:
         """
         Récupère un film par son ID IMDb
         - Données texte depuis OMDB
         - Images HD depuis TMDb
+        Les deux appels partent en parallèle.
         """
-        print(f"🔍 Récupération du film {imdb_id}...")
+        logger.debug("Récupération du film", extra={"imdb_id": imdb_id})
         
-        # 1. Récupérer données de base depuis OMDB
-        omdb_data = self._fetch_omdb_data(imdb_id)
+        omdb_data, tmdb_movie = await asyncio.gather(
+            self._fetch_omdb_data(imdb_id),
+            self._find_tmdb_movie(imdb_id)
+        )
         if not omdb_data:
-            print(f"❌ Échec OMDB pour {imdb_id}")
+            logger.info("Échec OMDb", extra={"imdb_id": imdb_id})
             return None
         
-        # 2. Extraire les données texte d'OMDB
         movie_data = self._transform_omdb_to_movie(omdb_data)
+        self._apply_tmdb_images(tmdb_movie, movie_data)
         
-        # 3. Récupérer images HD depuis TMDb
-        self._enhance_with_tmdb_images(imdb_id, movie_data)
-        
-        print(f"✅ Film récupéré: {movie_data['title']}")
+        logger.info("Film récupéré", extra={"imdb_id": imdb_id, "title": movie_data["title"]})
         return movie_data
     
-    def _fetch_omdb_data(self, imdb_id: str) -> Optional[Dict]:
-        """Récupère les données depuis OMDB API"""
+    def fetch_movie_by_imdb_id(self, imdb_id: str) -> Optional[Dict]:
+        """Version synchrone de fetch_movie_by_imdb_id_async"""
+        return self._run_sync(self.fetch_movie_by_imdb_id_async(imdb_id))
+    
+    async def _fetch_omdb_data(self, imdb_id: str) -> Optional[Dict]:
+        """Récupère les données depuis OMDB API (via le cache)"""
+        return await omdb_cache.get_or_load(imdb_id, lambda: self._request_omdb_data(imdb_id))
+    
+    async def _request_omdb(self, params: Dict, timeout: float = 10) -> Dict:
+        """Appel brut à OMDb, soumis au limiteur de débit"""
+        await omdb_limiter.acquire()
+        response = await get_http_client().get(
+            settings.OMDB_BASE_URL,
+            params={"apikey": self.omdb_key, **params},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    async def _request_omdb_data(self, imdb_id: str) -> Optional[Dict]:
+        """Appel OMDB API ; None si le film est introuvable ou en cas d'erreur"""
         try:
-            url = "http://www.omdbapi.com/"
-            params = {
-                "apikey": self.omdb_key,
-                "i": imdb_id,
-                "plot": "full"
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = await self._request_omdb({"i": imdb_id, "plot": "full"})
             if data.get("Response") == "True":
                 return data
             else:
-                print(f"❌ OMDB error: {data.get('Error')}")
+                logger.info("Erreur OMDb", extra={"imdb_id": imdb_id, "error": data.get("Error")})
                 return None
                 
         except Exception as e:
-            print(f"⚠️ Erreur OMDB: {e}")
+            logger.warning("Erreur OMDb", extra={"imdb_id": imdb_id, "error": str(e)})
             return None
     
-    def _enhance_with_tmdb_images(self, imdb_id: str, movie_data: Dict):
+    def _apply_tmdb_images(self, tmdb_movie: Optional[Dict], movie_data: Dict):
         """Améliore les images avec TMDb (poster + backdrop HD)"""
-        if not self.tmdb_key:
-            print("⚠️  Clé TMDb non configurée, images limitées")
+        if not tmdb_movie:
             return
         
+        # Mettre à jour les URLs d'images avec TMDb HD
+        base_url = "https://image.tmdb.org/t/p"
+        
+        # Backdrop HD (w1280 pour votre site)
+        backdrop_path = tmdb_movie.get("backdrop_path")
+        if backdrop_path:
+            movie_data["backdrop_url"] = f"{base_url}/w1280{backdrop_path}"
+        
+        # Poster HD (w500 pour bonne qualité)
+        poster_path = tmdb_movie.get("poster_path")
+        if poster_path:
+            movie_data["poster_url"] = f"{base_url}/w500{poster_path}"
+        
+        # Ajouter aussi la note TMDb si intéressé
+        movie_data["tmdb_rating"] = tmdb_movie.get("vote_average")
+        movie_data["tmdb_votes"] = tmdb_movie.get("vote_count")
+    
+    async def _find_tmdb_movie(self, imdb_id: str) -> Optional[Dict]:
+        """Premier résultat TMDb pour un ID IMDb (via le cache)"""
+        if not self.tmdb_key:
+            logger.debug("Clé TMDb non configurée, images limitées")
+            return None
+        return await tmdb_cache.get_or_load(imdb_id, lambda: self._request_tmdb_movie(imdb_id))
+    
+    async def _request_tmdb_movie(self, imdb_id: str) -> Optional[Dict]:
+        """Appel TMDb /find ; None si aucun résultat ou en cas d'erreur"""
         try:
-            # Petite pause pour éviter rate limiting
-            time.sleep(0.3)
+            await tmdb_limiter.acquire()
             
             # Chercher film sur TMDb par IMDb ID
-            url = f"https://api.themoviedb.org/3/find/{imdb_id}"
+            url = f"{settings.TMDB_BASE_URL}/find/{imdb_id}"
             params = {
                 "api_key": self.tmdb_key,
                 "external_source": "imdb_id",
                 "language": "fr-FR"
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = await get_http_client().get(url, params=params, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
-                movie_results = data.get("movie_results", [])
-                
+                movie_results = response.json().get("movie_results", [])
                 if movie_results:
-                    tmdb_movie = movie_results[0]
-                    
-                    # Mettre à jour les URLs d'images avec TMDb HD
-                    base_url = "https://image.tmdb.org/t/p"
-                    
-                    # Backdrop HD (w1280 pour votre site)
-                    backdrop_path = tmdb_movie.get("backdrop_path")
-                    if backdrop_path:
-                        movie_data["backdrop_url"] = f"{base_url}/w1280{backdrop_path}"
-                        print(f"   🖼️  Backdrop TMDb ajouté")
-                    
-                    # Poster HD (w500 pour bonne qualité)
-                    poster_path = tmdb_movie.get("poster_path")
-                    if poster_path:
-                        movie_data["poster_url"] = f"{base_url}/w500{poster_path}"
-                        print(f"   🎬  Poster TMDb HD ajouté")
-                    
-                    # Ajouter aussi la note TMDb si intéressé
-                    movie_data["tmdb_rating"] = tmdb_movie.get("vote_average")
-                    movie_data["tmdb_votes"] = tmdb_movie.get("vote_count")
-                else:
-                    print(f"   ℹ️  Aucun résultat TMDb pour {imdb_id}")
+                    return movie_results[0]
+                logger.debug("Aucun résultat TMDb", extra={"imdb_id": imdb_id})
             else:
-                print(f"   ⚠️  Erreur TMDb HTTP {response.status_code}")
+                logger.warning("Erreur TMDb", extra={"imdb_id": imdb_id, "status": response.status_code})
                 
         except Exception as e:
-            print(f"   ⚠️  Exception TMDb: {e}")
+            logger.warning("Erreur TMDb", extra={"imdb_id": imdb_id, "error": str(e)})
             # On continue sans TMDb, on garde les images OMDB
+        return None
     
     def _transform_omdb_to_movie(self, omdb_data: Dict) -> Dict:
         """Transformer les données OMDB au format de notre base de données"""
@@ -147,8 +203,7 @@ class MovieFetcherService:
             poster_url = None
         
         # Genres
-        genres_str = omdb_data.get("Genre", "")
-        genres = [g.strip() for g in genres_str.split(",") if g.strip()]
+        genres = parse_genres(omdb_data.get("Genre"))
         
         # Extraction de l'année
         year_str = omdb_data.get("Year", "")
@@ -178,94 +233,84 @@ class MovieFetcherService:
         }
     
     # Garder vos méthodes existantes pour la compatibilité
-    def fetch_movie_by_title(self, title: str) -> Optional[Dict]:
+    async def fetch_movie_by_title_async(self, title: str) -> Optional[Dict]:
         """Récupérer un film par son titre (utilisation OMDB seulement pour la recherche)"""
         try:
-            url = "http://www.omdbapi.com/"
-            params = {
-                "apikey": self.omdb_key,
-                "t": title,
-                "plot": "short"
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            data = await self._request_omdb({"t": title, "plot": "short"})
             
             if data.get("Response") == "True":
                 movie_data = self._transform_omdb_to_movie(data)
                 # Essayer d'améliorer avec TMDb si on a l'ID
                 if movie_data.get("imdb_id"):
-                    self._enhance_with_tmdb_images(movie_data["imdb_id"], movie_data)
+                    tmdb_movie = await self._find_tmdb_movie(movie_data["imdb_id"])
+                    self._apply_tmdb_images(tmdb_movie, movie_data)
                 return movie_data
             return None
         except Exception as e:
-            print(f"Erreur recherche par titre: {e}")
+            logger.warning("Erreur recherche OMDb par titre", extra={"title": title, "error": str(e)})
             return None
     
-    def search_movies(self, query: str) -> List[Dict]:
+    def fetch_movie_by_title(self, title: str) -> Optional[Dict]:
+        """Version synchrone de fetch_movie_by_title_async"""
+        return self._run_sync(self.fetch_movie_by_title_async(title))
+    
+    async def search_movies_async(self, query: str) -> List[Dict]:
         """Rechercher des films (OMDB seulement pour les résultats rapides)"""
         try:
-            url = "http://www.omdbapi.com/"
-            params = {
-                "apikey": self.omdb_key,
-                "s": query,
-                "type": "movie"
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            data = await self._request_omdb({"s": query, "type": "movie"})
             
             if data.get("Response") == "True":
                 return data.get("Search", [])
             return []
         except Exception as e:
-            print(f"Erreur recherche: {e}")
+            logger.warning("Erreur recherche OMDb", extra={"query": query, "error": str(e)})
             return []
     
-    # Ajouter dans la classe existante
-
-    def search_movies_autocomplete(self, query: str) -> List[Dict]:
+    def search_movies(self, query: str) -> List[Dict]:
+        """Version synchrone de search_movies_async"""
+        return self._run_sync(self.search_movies_async(query))
+    
+    async def search_movies_autocomplete_async(self, query: str) -> List[Dict]:
         """
         Recherche rapide pour auto-complétion
         Retourne les résultats formatés pour le frontend
         """
+        key = query.strip().lower()
+        results = await search_cache.get_or_load(key, lambda: self._request_autocomplete(query))
+        return results or []
+    
+    def search_movies_autocomplete(self, query: str) -> List[Dict]:
+        """Version synchrone de search_movies_autocomplete_async"""
+        return self._run_sync(self.search_movies_autocomplete_async(query))
+    
+    async def _request_autocomplete(self, query: str) -> Optional[List[Dict]]:
+        """Appel OMDb ?s= ; None en cas d'erreur"""
         try:
-            url = "http://www.omdbapi.com/"
-            params = {
-                "apikey": self.omdb_key,
-                "s": query,
-                "type": "movie",
-                "page": 1
-            }
-            
-            response = requests.get(url, params=params, timeout=5)
+            data = await self._request_omdb({"s": query, "type": "movie", "page": 1}, timeout=5)
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if data.get("Response") == "True" and data.get("Search"):
-                    results = []
-                    for movie in data["Search"]:
-                        # Formater les résultats pour l'auto-complétion
-                        results.append({
-                            "imdb_id": movie.get("imdbID"),
-                            "title": movie.get("Title"),
-                            "year": movie.get("Year"),
-                            "type": movie.get("Type"),
-                            "poster": movie.get("Poster") if movie.get("Poster") != "N/A" else None
-                        })
-                    return results
+            if data.get("Response") == "True" and data.get("Search"):
+                results = []
+                for movie in data["Search"]:
+                    # Formater les résultats pour l'auto-complétion
+                    results.append({
+                        "imdb_id": movie.get("imdbID"),
+                        "title": movie.get("Title"),
+                        "year": movie.get("Year"),
+                        "type": movie.get("Type"),
+                        "poster": movie.get("Poster") if movie.get("Poster") != "N/A" else None
+                    })
+                return results
             return []
             
         except Exception as e:
-            print(f"⚠️ Erreur recherche auto-complétion: {e}")
-            return []
+            logger.warning("Erreur recherche auto-complétion OMDb", extra={"query": query, "error": str(e)})
+            return None
 
-    def fetch_and_create_movie(self, imdb_id: str) -> Optional[Dict]:
+    async def fetch_and_create_movie_async(self, imdb_id: str) -> Optional[Dict]:
         """
         Récupère un film complet et le formate pour la création
         """
-        movie_data = self.fetch_movie_by_imdb_id(imdb_id)
+        movie_data = await self.fetch_movie_by_imdb_id_async(imdb_id)
         
         if not movie_data:
             return None
@@ -280,7 +325,11 @@ class MovieFetcherService:
             "plot": movie_data.get("plot", ""),
             "genres": movie_data.get("genres", "")
         }
+    
+    def fetch_and_create_movie(self, imdb_id: str) -> Optional[Dict]:
+        """Version synchrone de fetch_and_create_movie_async"""
+        return self._run_sync(self.fetch_and_create_movie_async(imdb_id))
 
 
 # Instance globale pour faciliter l'utilisation
-movie_fetcher = MovieFetcherService()
\ No newline at end of file
+movie_fetcher = MovieFetcherService()
@@ -1,7 +1,33 @@
+import logging
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
-from backend.models import Movie
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func
+from datetime import datetime
+from typing import List, Optional, Dict, Tuple
+from backend.models import Movie, MovieRatingStats, movie_genres
 from backend.schemas import MovieCreate, MovieUpdate
+from backend.services.search_service import SearchService
+from backend.services.autocomplete_index import autocomplete_index
+from backend.services.genre_service import GenreService
+from backend.pagination import paginate
+from backend import fragments
+
+logger = logging.getLogger(__name__)
+
+# Tri par note IMDb décroissante, films sans note à la fin
+IMDB_RATING_ORDER = [
+    (Movie.imdb_rating.is_(None), False),
+    (Movie.imdb_rating, True),
+    (Movie.title, False),
+    (Movie.id, False),
+]
+
+# Tri par note moyenne des utilisateurs (agrégat indexé), films sans note à la fin
+COMMUNITY_RATING_ORDER = [
+    (MovieRatingStats.average.is_(None), False),
+    (MovieRatingStats.average, True),
+    (Movie.id, False),
+]
 
 
 class MovieService:
@@ -11,20 +37,62 @@ class MovieService:
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Movie]:
         return db.query(Movie).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_page(db: Session, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Movie], Optional[str]]:
+        """Page de films par id croissant (pagination par curseur)"""
+        return paginate(db.query(Movie), [(Movie.id, False)], lambda m: [m.id], limit, cursor)
+    
+    @staticmethod
+    def get_page_by_imdb_rating(db: Session, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Movie], Optional[str]]:
+        """Page de films triés par note IMDb (pagination par curseur)"""
+        return paginate(
+            db.query(Movie), IMDB_RATING_ORDER,
+            lambda m: [m.imdb_rating is None, m.imdb_rating, m.title, m.id],
+            limit, cursor
+        )
+    
+    @staticmethod
+    def get_page_by_community_rating(db: Session, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Movie], Optional[str]]:
+        """Page de films triés par note moyenne des utilisateurs (pagination par curseur)"""
+        rows, next_cursor = paginate(
+            db.query(Movie, MovieRatingStats.average)
+            .outerjoin(MovieRatingStats, MovieRatingStats.movie_id == Movie.id),
+            COMMUNITY_RATING_ORDER,
+            lambda row: [row.average is None, row.average, row.Movie.id],
+            limit, cursor
+        )
+        return [row.Movie for row in rows], next_cursor
+    
     @staticmethod
     def get_by_id(db: Session, movie_id: int) -> Optional[Movie]:
         return db.query(Movie).filter(Movie.id == movie_id).first()
     
+    @staticmethod
+    def get_version(db: Session, movie_id: int) -> Optional[int]:
+        """Version du film (validateur HTTP) sans charger la ligne complète ; None si absent"""
+        row = db.query(Movie.version).filter(Movie.id == movie_id).first()
+        return None if row is None else (row.version or 0)
+    
     @staticmethod
     def get_by_imdb_id(db: Session, imdb_id: str) -> Optional[Movie]:
         return db.query(Movie).filter(Movie.imdb_id == imdb_id).first()
     
+    @staticmethod
+    def _catalogue_changed():
+        """Comptes de la navigation à facettes périmés"""
+        from backend.services.browse_service import BrowseService
+        BrowseService.invalidate()
+    
     @staticmethod
     def create(db: Session, movie: MovieCreate) -> Movie:
         db_movie = Movie(**movie.model_dump())
         db.add(db_movie)
+        db.flush()
+        GenreService.sync_movie(db, db_movie)
         db.commit()
         db.refresh(db_movie)
+        autocomplete_index.upsert(db_movie)
+        MovieService._catalogue_changed()
         return db_movie
     
     @staticmethod
@@ -34,8 +102,13 @@ class MovieService:
             update_data = movie.model_dump(exclude_unset=True)
             for key, value in update_data.items():
                 setattr(db_movie, key, value)
+            db_movie.version = func.coalesce(Movie.version, 0) + 1
+            if "genres" in update_data:
+                GenreService.sync_movie(db, db_movie)
             db.commit()
             db.refresh(db_movie)
+            autocomplete_index.upsert(db_movie)
+            MovieService._catalogue_changed()
         return db_movie
     
     @staticmethod
@@ -43,20 +116,21 @@ class MovieService:
         db_movie = MovieService.get_by_id(db, movie_id)
         if db_movie:
             db.delete(db_movie)
+            GenreService.unlink(db, movie_id)
             db.commit()
+            autocomplete_index.remove(movie_id)
+            fragments.invalidate_movie(movie_id)
+            MovieService._catalogue_changed()
             return True
         return False
     
     @staticmethod
-    def search_by_title(db: Session, title: str) -> List[Movie]:
-        """Search movies by title (case-insensitive)"""
-        print(f"🔍 Searching movies with title containing: '{title}'")
+    def search_by_title(db: Session, title: str, limit: int = 20) -> List[Movie]:
+        """Search movies by title, plot and genres (full-text, ranked)"""
         if not title or title.strip() == "":
             return []
-        results = db.query(Movie).filter(Movie.title.ilike(f"%{title}%")).all()
-        print(f"📊 Found {len(results)} movies for '{title}'")
-        for movie in results[:5]:  # Print first 5 results
-            print(f"   - {movie.title} (ID: {movie.id}, Year: {movie.year})")
+        results = SearchService.search(db, title, limit=limit)
+        logger.debug("Recherche de films", extra={"query": title, "results": len(results)})
         return results
     
     @staticmethod
@@ -64,29 +138,62 @@ class MovieService:
         return db.query(Movie).filter(Movie.year == year).all()
     
     @staticmethod
-    def filter_by_genre(db: Session, genre: str) -> List[Movie]:
-        return db.query(Movie).filter(Movie.genres.ilike(f"%{genre}%")).all()
+    def _genre_query(db: Session, genre: str, year: Optional[int] = None, min_rating: Optional[float] = None):
+        """Films d'un genre via l'index movie_genres, filtrables par année et note IMDb minimale"""
+        genre_row = GenreService.get_by_slug(db, genre)
+        if genre_row is None:
+            return None
+        query = (
+            db.query(Movie)
+            .join(movie_genres, movie_genres.c.movie_id == Movie.id)
+            .filter(movie_genres.c.genre_id == genre_row.id)
+        )
+        if year is not None:
+            query = query.filter(Movie.year == year)
+        if min_rating is not None:
+            query = query.filter(Movie.imdb_rating >= min_rating)
+        return query
     
     @staticmethod
-    def create_from_imdb_id(db: Session, imdb_id: str) -> Optional[Movie]:
+    def filter_by_genre(
+        db: Session, genre: str, year: Optional[int] = None, min_rating: Optional[float] = None
+    ) -> List[Movie]:
+        query = MovieService._genre_query(db, genre, year, min_rating)
+        return [] if query is None else query.order_by(Movie.id).all()
+    
+    @staticmethod
+    def get_page_by_genre(
+        db: Session, genre: str, year: Optional[int] = None, min_rating: Optional[float] = None,
+        limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[Movie], Optional[str]]:
+        """Page de films d'un genre par id croissant (pagination par curseur)"""
+        query = MovieService._genre_query(db, genre, year, min_rating)
+        if query is None:
+            return [], None
+        return paginate(query, [(Movie.id, False)], lambda m: [m.id], limit, cursor)
+    
+    @staticmethod
+    async def create_from_imdb_id(db: AsyncSession, imdb_id: str) -> Optional[Movie]:
         """
         Créer un film directement depuis un ID IMDb
         """
         from backend.services.movie_fetcher import MovieFetcherService
+        from backend.services.imdb_rating_service import ImdbRatingService
     
         # Vérifier si le film existe déjà
-        existing = MovieService.get_by_imdb_id(db, imdb_id)
+        existing = await db.run_sync(MovieService.get_by_imdb_id, imdb_id)
         if existing:
             return existing
     
         # Récupérer les données
         fetcher = MovieFetcherService()
-        movie_data = fetcher.fetch_movie_by_imdb_id(imdb_id)
+        movie_data = await fetcher.fetch_movie_by_imdb_id_async(imdb_id)
     
         if not movie_data:
             return None
     
-        # Créer le film
+        # Créer le film (la note IMDb d'OMDb est stockée directement)
+        imdb_rating = ImdbRatingService.parse_rating(movie_data.get("imdb_rating"))
         movie = Movie(
             imdb_id=movie_data["imdb_id"],
             title=movie_data["title"],
@@ -94,12 +201,19 @@ class MovieService:
             poster_url=movie_data.get("poster_url"),
             backdrop_url=movie_data.get("backdrop_url"),
             plot=movie_data.get("plot", ""),
-            genres=movie_data.get("genres", "")
+            genres=movie_data.get("genres", ""),
+            imdb_rating=imdb_rating,
+            imdb_rating_fetched_at=datetime.utcnow() if imdb_rating is not None else None,
+            imdb_rating_checked_at=datetime.utcnow()
         )
     
         db.add(movie)
-        db.commit()
-        db.refresh(movie)
+        await db.flush()
+        await db.run_sync(GenreService.sync_movie, movie)
+        await db.commit()
+        await db.refresh(movie)
+        autocomplete_index.upsert(movie)
+        MovieService._catalogue_changed()
         return movie
 
     @staticmethod
@@ -108,11 +222,11 @@ class MovieService:
         return db.query(Movie).order_by(Movie.id.desc()).limit(limit).all()
 
     @staticmethod
-    def search_external_movies(query: str) -> List[Dict]:
+    async def search_external_movies(query: str) -> List[Dict]:
         """
         Rechercher des films sur OMDb (pour auto-complétion)
         """
         from backend.services.movie_fetcher import MovieFetcherService
         fetcher = MovieFetcherService()
-        return fetcher.search_movies_autocomplete(query)
+        return await fetcher.search_movies_autocomplete_async(query)
     
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Classement personnel d'un utilisateur ("Mon Classement")
+Les films notés se lisent dans l'index (user_id, score DESC, movie_id) de
+ratings, à égalité de note par titre puis id (ordre historique des pages) : une
+page coûte une plage d'index et le tri des seuls films de la note en cours,
+quel que soit le nombre total de notes de l'utilisateur. La contrainte
+unique_user_movie_rating garantit une seule note par film, sans sous-requête
+de dédoublonnage.
+
+En mode include_unrated, les films non notés suivent, triés par titre, via une
+seconde requête paginée (NOT EXISTS sur la même contrainte unique) ; le
+curseur indique la phase en cours.
+"""
+from typing import List, Optional, Tuple
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+from backend.models import Movie, Rating
+from backend.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+
+RATED_ORDER = [(Rating.score, True), (Movie.title, False), (Movie.id, False)]
+UNRATED_ORDER = [(Movie.title, False), (Movie.id, False)]
+
+RATED_PHASE = "rated"
+UNRATED_PHASE = "unrated"
+
+
+class RankingService:
+    """Service du classement personnel"""
+
+    @staticmethod
+    def _decode(cursor: Optional[str]) -> Tuple[str, Optional[str]]:
+        if not cursor:
+            return RATED_PHASE, None
+        phase, inner = decode_cursor(cursor, 2)
+        if phase not in (RATED_PHASE, UNRATED_PHASE) or not (inner is None or isinstance(inner, str)):
+            raise InvalidCursor("Curseur invalide")
+        return phase, inner
+
+    @staticmethod
+    def _unrated_query(db: Session, user_id: int):
+        rated = exists().where(Rating.movie_id == Movie.id, Rating.user_id == user_id)
+        return db.query(Movie).filter(~rated)
+
+    @staticmethod
+    def get_page(
+        db: Session,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_unrated: bool = False
+    ) -> Tuple[List[Tuple[Movie, Optional[int]]], Optional[str]]:
+        """
+        Page du classement : (film, note) par note décroissante puis titre, puis films non notés
+        (note None) par titre si include_unrated.
+
+        Returns:
+            (lignes de la page, curseur de la page suivante ou None)
+        """
+        phase, inner = RankingService._decode(cursor)
+        items: List[Tuple[Movie, Optional[int]]] = []
+
+        if phase == RATED_PHASE:
+            rows, next_inner = paginate(
+                db.query(Movie, Rating.score)
+                .join(Rating, Rating.movie_id == Movie.id)
+                .filter(Rating.user_id == user_id),
+                RATED_ORDER,
+                lambda row: [row.score, row.Movie.title, row.Movie.id],
+                limit, inner
+            )
+            items = [(row.Movie, row.score) for row in rows]
+            if next_inner:
+                return items, encode_cursor([RATED_PHASE, next_inner])
+            if not include_unrated:
+                return items, None
+
+            # Notes épuisées : la page se complète avec les films non notés
+            phase, inner = UNRATED_PHASE, None
+            limit -= len(items)
+            if limit == 0:
+                more = db.query(RankingService._unrated_query(db, user_id).exists()).scalar()
+                return items, encode_cursor([UNRATED_PHASE, None]) if more else None
+
+        if phase == UNRATED_PHASE and not include_unrated:
+            return items, None
+
+        rows, next_inner = paginate(
+            RankingService._unrated_query(db, user_id),
+            UNRATED_ORDER,
+            lambda m: [m.title, m.id],
+            limit, inner
+        )
+        items += [(movie, None) for movie in rows]
+        return items, encode_cursor([UNRATED_PHASE, next_inner]) if next_inner else None
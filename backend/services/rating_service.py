@@ -1,8 +1,11 @@
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from backend.models import Rating
+from typing import List, Optional, Tuple
+from backend.batch_write import chunks
+from backend.database import dialect_insert
+from backend.models import Rating, MovieRatingStats
 from backend.schemas import RatingCreate, RatingUpdate
+from backend.pagination import paginate
 
 
 class RatingService:
@@ -12,6 +15,22 @@ class RatingService:
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Rating]:
         return db.query(Rating).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_page(
+        db: Session,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        user_id: Optional[int] = None,
+        movie_id: Optional[int] = None
+    ) -> Tuple[List[Rating], Optional[str]]:
+        """Page de notes par id croissant, filtrable par utilisateur ou film"""
+        query = db.query(Rating)
+        if user_id is not None:
+            query = query.filter(Rating.user_id == user_id)
+        if movie_id is not None:
+            query = query.filter(Rating.movie_id == movie_id)
+        return paginate(query, [(Rating.id, False)], lambda r: [r.id], limit, cursor)
+    
     @staticmethod
     def get_by_id(db: Session, rating_id: int) -> Optional[Rating]:
         return db.query(Rating).filter(Rating.id == rating_id).first()
@@ -23,23 +42,57 @@ class RatingService:
             Rating.movie_id == movie_id
         ).first()
     
+    @staticmethod
+    def upsert(db: Session, user_id: int, movie_id: int, score: int) -> Rating:
+        """
+        Poser ou remplacer la note d'un utilisateur en une instruction :
+        INSERT … ON CONFLICT (user_id, movie_id) DO UPDATE … RETURNING.
+        Pas de lecture préalable, donc pas de course entre deux requêtes simultanées
+        (plus d'IntegrityError sur unique_user_movie_rating). Ne valide pas la transaction ;
+        l'agrégat movie_rating_stats est déjà à jour (trigger) pour la suite de la transaction.
+        """
+        insert = dialect_insert(db.get_bind())
+        stmt = insert(Rating).values(user_id=user_id, movie_id=movie_id, score=score)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Rating.user_id, Rating.movie_id],
+            set_={"score": stmt.excluded.score}
+        ).returning(Rating)
+        return db.scalars(stmt, execution_options={"populate_existing": True}).one()
+    
     @staticmethod
     def create(db: Session, rating: RatingCreate) -> Rating:
-        # Vérifier si une note existe déjà
-        existing = RatingService.get_by_user_and_movie(db, rating.user_id, rating.movie_id)
-        if existing:
-            # Mettre à jour la note existante
-            existing.score = rating.score
-            db.commit()
-            db.refresh(existing)
-            return existing
-        
-        db_rating = Rating(**rating.model_dump())
-        db.add(db_rating)
+        """Créer ou mettre à jour une note (upsert atomique)"""
+        db_rating = RatingService.upsert(db, rating.user_id, rating.movie_id, rating.score)
+        # Détachée avant le commit : les valeurs de RETURNING restent lisibles sans SELECT de rafraîchissement
+        db.expunge(db_rating)
         db.commit()
-        db.refresh(db_rating)
         return db_rating
     
+    @staticmethod
+    def bulk_upsert(db: Session, ratings: List[RatingCreate]) -> List[Tuple[int, bool]]:
+        """
+        Upsert multi-lignes d'un lot de notes (couples (user_id, movie_id) distincts).
+        Retourne (id, créée) pour chaque note, dans l'ordre. Ne valide pas la transaction.
+        """
+        keys = [(r.user_id, r.movie_id) for r in ratings]
+        existing = set()
+        for chunk in chunks(keys):
+            existing.update(
+                tuple(row) for row in
+                db.execute(select(Rating.user_id, Rating.movie_id).where(tuple_(Rating.user_id, Rating.movie_id).in_(chunk)))
+            )
+        
+        insert = dialect_insert(db.get_bind())
+        stmt = insert(Rating.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Rating.user_id, Rating.movie_id],
+            set_={"score": stmt.excluded.score}
+        ).returning(Rating.id, Rating.user_id, Rating.movie_id)
+        # executemany + RETURNING : SQLAlchemy regroupe les lignes en INSERT multi-lignes
+        rows = db.execute(stmt, [r.model_dump() for r in ratings])
+        ids = {(row.user_id, row.movie_id): row.id for row in rows}
+        return [(ids[key], key not in existing) for key in keys]
+    
     @staticmethod
     def update(db: Session, rating_id: int, rating: RatingUpdate) -> Optional[Rating]:
         db_rating = RatingService.get_by_id(db, rating_id)
@@ -68,5 +121,6 @@ class RatingService:
     
     @staticmethod
     def get_average_rating(db: Session, movie_id: int) -> Optional[float]:
-        result = db.query(func.avg(Rating.score)).filter(Rating.movie_id == movie_id).scalar()
+        # Agrégat maintenu par triggers (movie_rating_stats) : lecture d'une ligne
+        result = db.query(MovieRatingStats.average).filter(MovieRatingStats.movie_id == movie_id).scalar()
         return round(result, 2) if result else None
@@ -0,0 +1,148 @@
+"""
+Agrégats de notes par film (table movie_rating_stats)
+Maintenus par des triggers sur ratings, dans la même transaction que l'écriture :
+moyenne, nombre de notes et distribution se lisent en une ligne, sans AVG/COUNT.
+- SQLite : triggers AFTER INSERT / DELETE / UPDATE
+- PostgreSQL : fonction plpgsql + trigger FOR EACH ROW
+"""
+import logging
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from backend.models import MovieRatingStats
+
+logger = logging.getLogger(__name__)
+
+STATS_COLUMNS = "movie_id, rating_count, rating_sum, count_1, count_2, count_3, count_4, count_5, average, updated_at"
+
+
+def _apply_sql(movie_id: str, score: str, delta: str) -> str:
+    """Ajouter (delta = 1) ou retirer (delta = -1) une note de l'agrégat d'un film"""
+    histogram = ", ".join(
+        f"count_{k} = count_{k} + CASE WHEN {score} = {k} THEN {delta} ELSE 0 END" for k in range(1, 6)
+    )
+    # Dans un UPDATE, les colonnes à droite de SET ont leur valeur d'avant la mise à jour
+    return (
+        f"INSERT INTO movie_rating_stats ({STATS_COLUMNS}) "
+        f"VALUES ({movie_id}, 0, 0, 0, 0, 0, 0, 0, NULL, CURRENT_TIMESTAMP) "
+        f"ON CONFLICT (movie_id) DO NOTHING; "
+        f"UPDATE movie_rating_stats SET "
+        f"rating_count = rating_count + {delta}, "
+        f"rating_sum = rating_sum + {delta} * {score}, "
+        f"{histogram}, "
+        f"average = CASE WHEN rating_count + {delta} > 0 "
+        f"THEN CAST(rating_sum + {delta} * {score} AS REAL) / (rating_count + {delta}) END, "
+        f"updated_at = CURRENT_TIMESTAMP "
+        f"WHERE movie_id = {movie_id};"
+    )
+
+
+SQLITE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS ratings_stats_ai AFTER INSERT ON ratings BEGIN
+        {_apply_sql("new.movie_id", "new.score", "1")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS ratings_stats_ad AFTER DELETE ON ratings BEGIN
+        {_apply_sql("old.movie_id", "old.score", "-1")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS ratings_stats_au AFTER UPDATE OF score, movie_id ON ratings BEGIN
+        {_apply_sql("old.movie_id", "old.score", "-1")}
+        {_apply_sql("new.movie_id", "new.score", "1")}
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movies_stats_ad AFTER DELETE ON movies BEGIN
+        DELETE FROM movie_rating_stats WHERE movie_id = old.id;
+    END""",
+]
+
+POSTGRES_TRIGGERS = [
+    f"""CREATE OR REPLACE FUNCTION movie_rating_stats_apply(p_movie_id INTEGER, p_score INTEGER, p_delta INTEGER)
+    RETURNS void AS $$
+    BEGIN
+        {_apply_sql("p_movie_id", "p_score", "p_delta").replace("AS REAL", "AS DOUBLE PRECISION")}
+    END;
+    $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION ratings_stats_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            PERFORM movie_rating_stats_apply(OLD.movie_id, OLD.score, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM movie_rating_stats_apply(NEW.movie_id, NEW.score, 1);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS ratings_stats ON ratings",
+    """CREATE TRIGGER ratings_stats AFTER INSERT OR DELETE OR UPDATE OF score, movie_id ON ratings
+    FOR EACH ROW EXECUTE FUNCTION ratings_stats_trigger()""",
+    """CREATE OR REPLACE FUNCTION movies_stats_trigger() RETURNS trigger AS $$
+    BEGIN
+        DELETE FROM movie_rating_stats WHERE movie_id = OLD.id;
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql""",
+    # BEFORE : la ligne d'agrégat référence le film par clé étrangère
+    "DROP TRIGGER IF EXISTS movies_stats ON movies",
+    """CREATE TRIGGER movies_stats BEFORE DELETE ON movies
+    FOR EACH ROW EXECUTE FUNCTION movies_stats_trigger()""",
+]
+
+# Recalcul complet depuis ratings (première installation sur une base existante)
+REBUILD_SQL = [
+    "DELETE FROM movie_rating_stats",
+    f"""INSERT INTO movie_rating_stats ({STATS_COLUMNS})
+    SELECT movie_id, COUNT(*), SUM(score),
+        SUM(CASE WHEN score = 1 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN score = 2 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN score = 3 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN score = 4 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN score = 5 THEN 1 ELSE 0 END),
+        AVG(CAST(score AS FLOAT)), CURRENT_TIMESTAMP
+    FROM ratings GROUP BY movie_id""",
+]
+
+
+class RatingStatsService:
+    """Service des agrégats de notes"""
+
+    @staticmethod
+    def ensure_triggers(bind):
+        """Installer les triggers (idempotent) et remplir la table si elle est vide"""
+        dialect = bind.dialect.name
+        if dialect == "sqlite":
+            statements = SQLITE_TRIGGERS
+        elif dialect == "postgresql":
+            statements = POSTGRES_TRIGGERS
+        else:
+            logger.warning("Agrégats de notes non maintenus pour ce dialecte", extra={"dialect": dialect})
+            return
+
+        with bind.begin() as conn:
+            for ddl in statements:
+                conn.execute(text(ddl))
+            empty = conn.execute(text("SELECT 1 FROM movie_rating_stats LIMIT 1")).first() is None
+            if empty and conn.execute(text("SELECT 1 FROM ratings LIMIT 1")).first():
+                for sql in REBUILD_SQL:
+                    conn.execute(text(sql))
+
+    @staticmethod
+    def rebuild(bind):
+        """Recalculer tous les agrégats depuis la table ratings"""
+        with bind.begin() as conn:
+            for sql in REBUILD_SQL:
+                conn.execute(text(sql))
+
+    @staticmethod
+    def get(db: Session, movie_id: int) -> Optional[MovieRatingStats]:
+        return db.get(MovieRatingStats, movie_id)
+
+    @staticmethod
+    def summary(db: Session, movie_id: int) -> dict:
+        """Moyenne, nombre de notes et distribution d'un film"""
+        stats = RatingStatsService.get(db, movie_id)
+        if not stats or not stats.rating_count:
+            return {"average": None, "count": 0, "distribution": {k: 0 for k in range(1, 6)}}
+        return {
+            "average": stats.average,
+            "count": stats.rating_count,
+            "distribution": stats.distribution,
+        }
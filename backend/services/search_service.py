@@ -0,0 +1,148 @@
+"""
+Recherche plein texte dans le catalogue (titre, synopsis, genres)
+- PostgreSQL : index GIN sur un tsvector pondéré + index trigramme (pg_trgm) sur le titre
+- SQLite : table virtuelle FTS5 synchronisée par triggers
+- autres bases : ILIKE sur le titre
+Les requêtes sont classées par pertinence et le LIMIT est appliqué en SQL.
+"""
+import logging
+import re
+from typing import List
+from sqlalchemy import text, func, or_, literal_column
+from sqlalchemy.orm import Session
+from backend.models import Movie
+
+logger = logging.getLogger(__name__)
+
+# Vecteur pondéré : titre (A) > genres (B) > synopsis (C).
+# L'expression doit être identique dans l'index et dans les requêtes.
+PG_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(genres, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(plot, '')), 'C')"
+)
+
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE movies_fts USING fts5(
+        title, plot, genres,
+        content='movies', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS movies_fts_ai AFTER INSERT ON movies BEGIN
+        INSERT INTO movies_fts(rowid, title, plot, genres)
+        VALUES (new.id, new.title, new.plot, new.genres);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movies_fts_ad AFTER DELETE ON movies BEGIN
+        INSERT INTO movies_fts(movies_fts, rowid, title, plot, genres)
+        VALUES ('delete', old.id, old.title, old.plot, old.genres);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movies_fts_au AFTER UPDATE OF title, plot, genres ON movies BEGIN
+        INSERT INTO movies_fts(movies_fts, rowid, title, plot, genres)
+        VALUES ('delete', old.id, old.title, old.plot, old.genres);
+        INSERT INTO movies_fts(rowid, title, plot, genres)
+        VALUES (new.id, new.title, new.plot, new.genres);
+    END""",
+    # Index existant : on remplit la table à partir de movies
+    "INSERT INTO movies_fts(movies_fts) VALUES ('rebuild')",
+]
+
+# Mode de recherche déterminé au démarrage par ensure_index()
+_backend = {"mode": "like", "trigram": False}
+
+
+class SearchService:
+    """Service de recherche plein texte"""
+
+    @staticmethod
+    def tokenize(query: str) -> List[str]:
+        """Mots de la requête (lettres et chiffres uniquement)"""
+        return re.findall(r"\w+", query.lower())
+
+    @staticmethod
+    def ensure_index(bind):
+        """Créer les index de recherche s'ils n'existent pas (idempotent)"""
+        dialect = bind.dialect.name
+
+        if dialect == "sqlite":
+            with bind.begin() as conn:
+                try:
+                    exists = conn.execute(text(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'movies_fts'"
+                    )).first()
+                    if not exists:
+                        for ddl in SQLITE_FTS_DDL:
+                            conn.execute(text(ddl))
+                    _backend["mode"] = "fts5"
+                except Exception as e:
+                    # SQLite compilé sans FTS5
+                    logger.warning("FTS5 indisponible, recherche par LIKE", extra={"error": str(e)})
+
+        elif dialect == "postgresql":
+            with bind.begin() as conn:
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS ix_movies_search_tsv ON movies USING GIN (({PG_SEARCH_VECTOR}))"
+                ))
+            _backend["mode"] = "tsvector"
+            try:
+                with bind.begin() as conn:
+                    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                    conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_movies_title_trgm ON movies USING GIN (title gin_trgm_ops)"
+                    ))
+                _backend["trigram"] = True
+            except Exception as e:
+                # Extension non installable (droits insuffisants)
+                logger.warning("pg_trgm indisponible, recherche sans trigrammes", extra={"error": str(e)})
+
+    @staticmethod
+    def search(db: Session, query: str, limit: int = 20) -> List[Movie]:
+        """Films correspondant à la requête, les plus pertinents d'abord"""
+        tokens = SearchService.tokenize(query or "")
+        if not tokens:
+            return []
+
+        mode = _backend["mode"]
+        if mode == "fts5":
+            return SearchService._search_fts5(db, tokens, limit)
+        if mode == "tsvector":
+            return SearchService._search_tsvector(db, query, tokens, limit)
+        return (
+            db.query(Movie)
+            .filter(Movie.title.ilike(f"%{query.strip()}%"))
+            .order_by(Movie.title)
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def _search_fts5(db: Session, tokens: List[str], limit: int) -> List[Movie]:
+        # Chaque mot est un préfixe : "dark kni" trouve "The Dark Knight"
+        match = " ".join(f'"{token}"*' for token in tokens)
+        stmt = text(
+            "SELECT movies.* FROM movies_fts "
+            "JOIN movies ON movies.id = movies_fts.rowid "
+            "WHERE movies_fts MATCH :match "
+            "ORDER BY bm25(movies_fts, 10.0, 1.0, 3.0), movies.title "
+            "LIMIT :limit"
+        )
+        return db.query(Movie).from_statement(stmt).params(match=match, limit=limit).all()
+
+    @staticmethod
+    def _search_tsvector(db: Session, query: str, tokens: List[str], limit: int) -> List[Movie]:
+        vector = literal_column(f"({PG_SEARCH_VECTOR})")
+        tsquery = func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+        rank = func.ts_rank(vector, tsquery)
+        condition = vector.op("@@")(tsquery)
+
+        if _backend["trigram"]:
+            # Sous-chaîne du titre (servie par l'index trigramme) et similarité dans le score
+            condition = or_(condition, Movie.title.ilike(f"%{query.strip()}%"))
+            rank = rank + func.similarity(Movie.title, query.strip())
+
+        return (
+            db.query(Movie)
+            .filter(condition)
+            .order_by(rank.desc(), Movie.title)
+            .limit(limit)
+            .all()
+        )
@@ -1,10 +1,10 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 from backend.models import User
 from backend.schemas import UserCreate, UserUpdate
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from backend.pagination import paginate
+from backend.password_hasher import pwd_context, password_hasher
 
 
 class UserService:
@@ -20,10 +20,20 @@ class UserService:
         """Vérifier un mot de passe"""
         return pwd_context.verify(plain_password, hashed_password)
     
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        """Hasher un mot de passe dans le pool dédié (handlers async)"""
+        return await password_hasher.hash(password)
+    
     @staticmethod
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
         return db.query(User).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_page(db: Session, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[User], Optional[str]]:
+        """Page d'utilisateurs par id croissant (pagination par curseur)"""
+        return paginate(db.query(User), [(User.id, False)], lambda u: [u.id], limit, cursor)
+    
     @staticmethod
     def get_by_id(db: Session, user_id: int) -> Optional[User]:
         return db.query(User).filter(User.id == user_id).first()
@@ -80,3 +90,20 @@ class UserService:
         if not UserService.verify_password(password, user.password_hash):
             return None
         return user
+    
+    @staticmethod
+    async def authenticate_async(db: AsyncSession, username: str, password: str) -> Optional[User]:
+        """
+        Authentifier un utilisateur sans bloquer la boucle d'événements.
+        Un hash calculé avec un ancien coût est remplacé de façon transparente.
+        """
+        user = await db.run_sync(UserService.get_by_username, username)
+        valid, new_hash = await password_hasher.verify_and_update(
+            password, user.password_hash if user else None
+        )
+        if not valid:
+            return None
+        if new_hash:
+            user.password_hash = new_hash
+            await db.commit()
+        return user
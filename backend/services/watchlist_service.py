@@ -1,7 +1,22 @@
+from sqlalchemy import delete, select, tuple_
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import FrozenSet, List, Optional, Tuple
+from backend.cache import TTLCache, MISSING
+from backend.config import get_settings
+from backend.batch_write import chunks
+from backend.database import dialect_insert
 from backend.models import Watchlist
 from backend.schemas import WatchlistCreate, WatchlistUpdate
+from backend.pagination import paginate
+
+settings = get_settings()
+
+# IDs des films en watchlist, par utilisateur : un seul SELECT partagé par les pages HTML
+watchlist_ids_cache = TTLCache(
+    max_size=settings.WATCHLIST_CACHE_MAX_SIZE,
+    ttl=settings.WATCHLIST_CACHE_TTL,
+    name="watchlist_ids"
+)
 
 
 class WatchlistService:
@@ -11,6 +26,41 @@ class WatchlistService:
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Watchlist]:
         return db.query(Watchlist).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_page(
+        db: Session,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        user_id: Optional[int] = None,
+        movie_id: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> Tuple[List[Watchlist], Optional[str]]:
+        """Page d'entrées de watchlist par id croissant"""
+        query = db.query(Watchlist)
+        if user_id is not None:
+            query = query.filter(Watchlist.user_id == user_id)
+        if movie_id is not None:
+            query = query.filter(Watchlist.movie_id == movie_id)
+        if status:
+            query = query.filter(Watchlist.status == status)
+        return paginate(query, [(Watchlist.id, False)], lambda w: [w.id], limit, cursor)
+    
+    @staticmethod
+    def get_movie_ids(db: Session, user_id: int) -> FrozenSet[int]:
+        """IDs des films de la watchlist d'un utilisateur (test d'appartenance en O(1))"""
+        movie_ids = watchlist_ids_cache.get(user_id)
+        if movie_ids is MISSING:
+            movie_ids = frozenset(
+                row[0] for row in db.query(Watchlist.movie_id).filter(Watchlist.user_id == user_id)
+            )
+            watchlist_ids_cache.set(user_id, movie_ids)
+        return movie_ids
+    
+    @staticmethod
+    def invalidate_movie_ids(user_id: int):
+        """À appeler après toute écriture dans la watchlist de l'utilisateur"""
+        watchlist_ids_cache.invalidate(user_id)
+    
     @staticmethod
     def get_by_id(db: Session, watchlist_id: int) -> Optional[Watchlist]:
         return db.query(Watchlist).filter(Watchlist.id == watchlist_id).first()
@@ -22,23 +72,83 @@ class WatchlistService:
             Watchlist.movie_id == movie_id
         ).first()
     
+    @staticmethod
+    def upsert(db: Session, user_id: int, movie_id: int, status: str) -> Watchlist:
+        """
+        Ajouter un film ou changer son statut en une instruction
+        (INSERT … ON CONFLICT (user_id, movie_id) DO UPDATE … RETURNING). Ne valide pas la transaction.
+        """
+        insert = dialect_insert(db.get_bind())
+        stmt = insert(Watchlist).values(user_id=user_id, movie_id=movie_id, status=status)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Watchlist.user_id, Watchlist.movie_id],
+            set_={"status": stmt.excluded.status}
+        ).returning(Watchlist)
+        return db.scalars(stmt, execution_options={"populate_existing": True}).one()
+    
+    @staticmethod
+    def toggle(db: Session, user_id: int, movie_id: int, status: str = "planned") -> bool:
+        """
+        Ajouter le film s'il est absent, le retirer sinon ; retourne True s'il est désormais présent.
+        INSERT … ON CONFLICT DO NOTHING RETURNING, puis DELETE seulement en cas de conflit :
+        deux clics simultanés s'annulent au lieu de heurter la contrainte unique.
+        Ne valide pas la transaction.
+        """
+        insert = dialect_insert(db.get_bind())
+        added = db.execute(
+            insert(Watchlist.__table__)
+            .values(user_id=user_id, movie_id=movie_id, status=status)
+            .on_conflict_do_nothing(index_elements=[Watchlist.user_id, Watchlist.movie_id])
+            .returning(Watchlist.id)
+        ).first()
+        if added is not None:
+            return True
+        db.execute(
+            delete(Watchlist).where(Watchlist.user_id == user_id, Watchlist.movie_id == movie_id)
+        )
+        return False
+    
     @staticmethod
     def create(db: Session, watchlist: WatchlistCreate) -> Watchlist:
-        # Vérifier si l'entrée existe déjà
-        existing = WatchlistService.get_by_user_and_movie(db, watchlist.user_id, watchlist.movie_id)
-        if existing:
-            # Mettre à jour le statut
-            existing.status = watchlist.status
-            db.commit()
-            db.refresh(existing)
-            return existing
-        
-        db_watchlist = Watchlist(**watchlist.model_dump())
-        db.add(db_watchlist)
+        """Ajouter ou mettre à jour une entrée (upsert atomique)"""
+        db_watchlist = WatchlistService.upsert(db, watchlist.user_id, watchlist.movie_id, watchlist.status)
+        # Détachée avant le commit : les valeurs de RETURNING restent lisibles sans SELECT de rafraîchissement
+        db.expunge(db_watchlist)
         db.commit()
-        db.refresh(db_watchlist)
+        WatchlistService.invalidate_movie_ids(db_watchlist.user_id)
         return db_watchlist
     
+    @staticmethod
+    def bulk_upsert(db: Session, entries: List[WatchlistCreate]) -> List[Tuple[int, bool]]:
+        """
+        Upsert multi-lignes d'un lot d'entrées (couples (user_id, movie_id) distincts).
+        Retourne (id, créée) pour chaque entrée, dans l'ordre. Ne valide pas la transaction
+        ni n'invalide le cache : voir invalidate_entries, à appeler après le commit.
+        """
+        keys = [(e.user_id, e.movie_id) for e in entries]
+        existing = set()
+        for chunk in chunks(keys):
+            existing.update(
+                tuple(row) for row in
+                db.execute(select(Watchlist.user_id, Watchlist.movie_id).where(tuple_(Watchlist.user_id, Watchlist.movie_id).in_(chunk)))
+            )
+        
+        insert = dialect_insert(db.get_bind())
+        stmt = insert(Watchlist.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Watchlist.user_id, Watchlist.movie_id],
+            set_={"status": stmt.excluded.status}
+        ).returning(Watchlist.id, Watchlist.user_id, Watchlist.movie_id)
+        rows = db.execute(stmt, [e.model_dump() for e in entries])
+        ids = {(row.user_id, row.movie_id): row.id for row in rows}
+        return [(ids[key], key not in existing) for key in keys]
+    
+    @staticmethod
+    def invalidate_entries(entries: List[WatchlistCreate]):
+        """Invalider le cache des utilisateurs d'un lot, une fois celui-ci validé"""
+        for user_id in {e.user_id for e in entries}:
+            WatchlistService.invalidate_movie_ids(user_id)
+    
     @staticmethod
     def update(db: Session, watchlist_id: int, watchlist: WatchlistUpdate) -> Optional[Watchlist]:
         db_watchlist = WatchlistService.get_by_id(db, watchlist_id)
@@ -52,8 +162,10 @@ class WatchlistService:
     def delete(db: Session, watchlist_id: int) -> bool:
         db_watchlist = WatchlistService.get_by_id(db, watchlist_id)
         if db_watchlist:
+            user_id = db_watchlist.user_id
             db.delete(db_watchlist)
             db.commit()
+            WatchlistService.invalidate_movie_ids(user_id)
             return True
         return False
     
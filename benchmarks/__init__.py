@@ -0,0 +1 @@
+"""Benchmarks de charge des routes chaudes (voir benchmarks/README.md)"""
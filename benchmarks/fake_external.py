@@ -0,0 +1,106 @@
+"""
+Faux serveur OMDb / TMDb pour les benchmarks
+
+    python -m benchmarks.fake_external --port 8765 --latency 0.05
+
+L'application le cible via OMDB_BASE_URL=http://127.0.0.1:8765/ et
+TMDB_BASE_URL=http://127.0.0.1:8765/3 : aucun appel ne sort de la machine, les
+réponses sont déterministes et la latence réseau est simulée (--latency).
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def _rating(imdb_id: str) -> str:
+    digest = int(hashlib.sha1(imdb_id.encode()).hexdigest()[:8], 16)
+    return f"{2 + digest % 75 / 10:.1f}"
+
+
+def omdb_response(params: dict) -> dict:
+    if "i" in params:
+        imdb_id = params["i"]
+        return {
+            "Response": "True",
+            "imdbID": imdb_id,
+            "Title": f"Fake Movie {imdb_id}",
+            "Year": "2001",
+            "Genre": "Drama, Thriller",
+            "Plot": "A synthetic plot served by the benchmark OMDb stub.",
+            "Poster": "N/A",
+            "imdbRating": _rating(imdb_id),
+        }
+    if "s" in params:
+        query = params["s"]
+        return {
+            "Response": "True",
+            "Search": [
+                {"imdbID": f"tt8{i:06d}", "Title": f"{query.title()} {i}", "Year": str(1990 + i), "Type": "movie", "Poster": "N/A"}
+                for i in range(10)
+            ],
+        }
+    return {"Response": "False", "Error": "Incorrect IMDb ID."}
+
+
+def tmdb_response(imdb_id: str) -> dict:
+    return {"movie_results": [{
+        "poster_path": f"/{imdb_id}-poster.jpg",
+        "backdrop_path": f"/{imdb_id}-backdrop.jpg",
+        "vote_average": 7.1,
+        "vote_count": 1000,
+    }]}
+
+
+class FakeExternalHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    protocol_version = "HTTP/1.1"  # keep-alive, comme les vraies APIs
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path.startswith("/3/find/"):
+            body = tmdb_response(url.path.rsplit("/", 1)[-1])
+        else:
+            body = omdb_response(params)
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(port: int = 0, latency: float = 0.0) -> ThreadingHTTPServer:
+    """Démarrer le serveur dans un thread ; port 0 = port libre (voir server.server_port)"""
+    handler = type("Handler", (FakeExternalHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Faux OMDb / TMDb local")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Secondes ajoutées à chaque réponse")
+    args = parser.parse_args(argv)
+
+    server = start(args.port, args.latency)
+    print(f"🎭 Faux OMDb/TMDb sur http://127.0.0.1:{server.server_port}/ (latence {args.latency}s)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
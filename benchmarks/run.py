@@ -0,0 +1,294 @@
+"""
+Benchmark de charge des routes chaudes
+
+    python -m benchmarks.run                          # génère la base si besoin, mesure, compare à la référence
+    python -m benchmarks.run --scenarios home movie   # sous-ensemble
+    python -m benchmarks.run --update-baseline        # enregistre les résultats comme nouvelle référence
+
+Déroulé : catalogue synthétique (benchmarks.seed, une seule fois par jeu de
+paramètres), faux OMDb/TMDb local (benchmarks.fake_external), application
+lancée par uvicorn dans un sous-processus, puis chaque scénario tourne
+--duration secondes avec --concurrency clients après un échauffement.
+Le code de sortie vaut 1 si un scénario régresse au-delà de --tolerance
+(débit plus bas ou p95 plus haut que la référence).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks import fake_external
+from benchmarks.vocabulary import BENCH_PASSWORD, TITLE_WORDS
+
+DATA_DIR = ROOT / "benchmarks" / ".data"
+BASELINE_PATH = ROOT / "benchmarks" / "baseline.json"
+
+# Scénario : rng -> (méthode, chemin, arguments httpx) ; `login` : exécuté avec une session connectée
+Request = Tuple[str, str, dict]
+
+
+class Scenario:
+    def __init__(self, build: Callable[[random.Random, dict], Request], login: bool = False):
+        self.build = build
+        self.login = login
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "home": Scenario(lambda rng, catalogue: ("GET", "/", {})),
+    "movies": Scenario(lambda rng, catalogue: ("GET", "/movies", {})),
+    "movie": Scenario(lambda rng, catalogue: ("GET", f"/movie/{rng.randint(1, catalogue['movies'])}", {})),
+    "search": Scenario(lambda rng, catalogue: ("GET", "/search", {"params": {"query": rng.choice(TITLE_WORDS)}})),
+    "api_search": Scenario(lambda rng, catalogue: (
+        "GET", "/api/search/movies", {"params": {"query": rng.choice(TITLE_WORDS)[:rng.randint(2, 5)]}}
+    )),
+    "rate": Scenario(lambda rng, catalogue: (
+        "POST", f"/api/movies/{rng.randint(1, catalogue['movies'])}/rating", {"json": {"rating": rng.randint(1, 5)}}
+    ), login=True),
+}
+
+
+# ========== Préparation ==========
+
+def ensure_catalogue(database: Path, sizes: dict) -> dict:
+    """Générer la base si elle n'existe pas (ou pas avec ces paramètres)"""
+    manifest = database.with_suffix(".json")
+    if database.exists() and manifest.exists() and json.loads(manifest.read_text()) == sizes:
+        return sizes
+
+    database.parent.mkdir(parents=True, exist_ok=True)
+    for path in (database, manifest, Path(f"{database}-wal"), Path(f"{database}-shm")):
+        path.unlink(missing_ok=True)
+
+    args = [f"--{key}={value}" for key, value in sizes.items()]
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database}", "LOG_LEVEL": "WARNING"}
+    subprocess.run([sys.executable, "-m", "benchmarks.seed", *args], cwd=ROOT, env=env, check=True)
+    manifest.write_text(json.dumps(sizes))
+    return sizes
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(database: Path, fake_port: int, workers: int) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{database}",
+        "OMDB_BASE_URL": f"http://127.0.0.1:{fake_port}/",
+        "TMDB_BASE_URL": f"http://127.0.0.1:{fake_port}/3",
+        "OMDB_API_KEY": "bench",
+        "DEBUG": "False",
+        # Les requêtes lentes sont attendues sous charge : garder la sortie lisible
+        "LOG_LEVEL": "ERROR",
+        # Pas de tâche de fond qui concurrencerait la mesure
+        "IMDB_REFRESH_ENABLED": "False",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + 180
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"L'application s'est arrêtée (code {process.returncode})")
+        try:
+            if httpx.get(f"{base_url}/login", timeout=2).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("L'application n'a pas démarré à temps")
+
+
+async def login(client: httpx.AsyncClient):
+    response = await client.post("/login", data={"username": "bench1", "password": BENCH_PASSWORD})
+    if "rapidocine_session" not in client.cookies:
+        raise RuntimeError(f"Connexion impossible (HTTP {response.status_code})")
+
+
+# ========== Mesure ==========
+
+async def drive(client: httpx.AsyncClient, scenario: Scenario, catalogue: dict,
+                concurrency: int, duration: float, seed: int) -> Tuple[List[float], int, float]:
+    """`concurrency` clients en boucle fermée pendant `duration` secondes"""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            method, path, kwargs = scenario.build(rng, catalogue)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    if len(latencies) < 2:
+        return {"requests": len(latencies), "errors": errors, "rps": 0.0}
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+    }
+
+
+async def run_scenarios(base_url: str, names: List[str], catalogue: dict,
+                        concurrency: int, duration: float, warmup: float) -> Dict[str, dict]:
+    results = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    for index, name in enumerate(names):
+        scenario = SCENARIOS[name]
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            if scenario.login:
+                await login(client)
+            await drive(client, scenario, catalogue, concurrency, warmup, seed=index)
+            latencies, errors, elapsed = await drive(client, scenario, catalogue, concurrency, duration, seed=index + 1)
+        results[name] = summarize(latencies, errors, elapsed)
+        r = results[name]
+        print(f"   {name:<11} {r['rps']:>8} req/s   p50 {r.get('p50_ms', '-'):>8} ms   "
+              f"p95 {r.get('p95_ms', '-'):>8} ms   p99 {r.get('p99_ms', '-'):>8} ms   erreurs {r['errors']}")
+    return results
+
+
+# ========== Référence ==========
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Régressions par rapport à la référence (débit plus bas, p95 plus haut, nouvelles erreurs)"""
+    if baseline.get("config") != results["config"]:
+        print("⚠️  Configuration différente de la référence : comparaison indicative")
+
+    regressions = []
+    for name, current in results["scenarios"].items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if not reference:
+            continue
+        if current["rps"] < reference["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: débit {current['rps']} req/s < référence {reference['rps']}")
+        if "p95_ms" in current and "p95_ms" in reference and current["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms > référence {reference['p95_ms']}")
+        if current["errors"] and not reference["errors"]:
+            regressions.append(f"{name}: {current['errors']} erreurs (aucune dans la référence)")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de charge des routes chaudes")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=15.0, help="Secondes mesurées par scénario")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Secondes d'échauffement par scénario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clients simultanés")
+    parser.add_argument("--workers", type=int, default=1, help="Workers uvicorn")
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--ratings", type=int, default=1_000_000)
+    parser.add_argument("--comments", type=int, default=200_000)
+    parser.add_argument("--external-latency", type=float, default=0.05, help="Latence simulée d'OMDb/TMDb (s)")
+    parser.add_argument("--database", type=Path, default=DATA_DIR / "bench.db")
+    parser.add_argument("--output", type=Path, default=DATA_DIR / "results.json")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Écart toléré avant régression (0.25 = 25 %%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = {"movies": args.movies, "users": args.users, "ratings": args.ratings, "comments": args.comments}
+    catalogue = ensure_catalogue(args.database.resolve(), sizes)
+
+    fake = fake_external.start(latency=args.external_latency)
+    process, base_url = start_app(args.database.resolve(), fake.server_port, args.workers)
+    print(f"🏁 {len(args.scenarios)} scénarios, {args.concurrency} clients, {args.duration}s chacun ({base_url})")
+    try:
+        scenarios = asyncio.run(run_scenarios(
+            base_url, args.scenarios, catalogue, args.concurrency, args.duration, args.warmup
+        ))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        fake.shutdown()
+
+    results = {
+        "config": {
+            "catalogue": sizes,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "workers": args.workers,
+            "external_latency": args.external_latency,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "commit": _git_commit(),
+        },
+        "scenarios": scenarios,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"📌 Référence mise à jour : {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print("ℹ️  Pas de référence : relancer avec --update-baseline pour l'enregistrer")
+        return
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    if regressions:
+        print("❌ Régressions :")
+        for line in regressions:
+            print(f"   - {line}")
+        sys.exit(1)
+    print("✅ Pas de régression par rapport à la référence")
+
+
+if __name__ == "__main__":
+    main()
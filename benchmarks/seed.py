@@ -0,0 +1,142 @@
+"""
+Catalogue synthétique pour les benchmarks
+
+    DATABASE_URL=sqlite:///./benchmarks/.data/bench.db python -m benchmarks.seed
+    python -m benchmarks.seed --movies 100000 --users 2000 --ratings 1000000 --comments 200000
+
+Données déterministes (graine fixe) : deux bases générées avec les mêmes
+paramètres sont identiques, les résultats restent comparables d'une exécution
+à l'autre. Tous les utilisateurs ont le mot de passe BENCH_PASSWORD.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import insert
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.database import engine, prepare_database
+from backend.models import Comment, Movie, Rating, User
+from backend.password_hasher import pwd_context
+from backend.services.genre_service import GenreService
+from benchmarks.vocabulary import BENCH_PASSWORD, COMMENT_WORDS, GENRES, TITLE_WORDS
+
+BATCH_SIZE = 5000
+
+
+def _batches(rows, size: int = BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(model, rows) -> int:
+    """INSERT multi-lignes par lots, une transaction par table"""
+    count = 0
+    with engine.begin() as conn:
+        for batch in _batches(rows):
+            conn.execute(insert(model), batch)
+            count += len(batch)
+    return count
+
+
+def movie_rows(rng: random.Random, count: int):
+    fetched_at = datetime.utcnow()
+    for i in range(1, count + 1):
+        title = " ".join(rng.sample(TITLE_WORDS, rng.randint(1, 4))).title()
+        has_rating = rng.random() < 0.8
+        yield {
+            "imdb_id": f"tt{9000000 + i:07d}",
+            "title": f"{title} {i}",
+            "year": rng.randint(1950, 2024),
+            "poster_url": f"https://img.example/poster/{i}.jpg",
+            "backdrop_url": None,
+            "plot": " ".join(rng.choices(TITLE_WORDS + COMMENT_WORDS, k=rng.randint(15, 40))).capitalize() + ".",
+            "genres": ", ".join(rng.sample(GENRES, rng.randint(1, 3))),
+            "imdb_rating": round(rng.uniform(2.0, 9.5), 1) if has_rating else None,
+            "imdb_rating_fetched_at": fetched_at if has_rating else None,
+        }
+
+
+def user_rows(count: int):
+    # Un seul hash : bcrypt coûterait des minutes pour des milliers d'utilisateurs
+    password_hash = pwd_context.hash(BENCH_PASSWORD)
+    for i in range(1, count + 1):
+        yield {"username": f"bench{i}", "email": f"bench{i}@bench.local", "password_hash": password_hash}
+
+
+def rating_rows(rng: random.Random, users: int, movies: int, count: int):
+    """Au plus une note par (utilisateur, film), répartie équitablement entre les utilisateurs"""
+    per_user, extra = divmod(count, users)
+    for user_id in range(1, users + 1):
+        k = min(movies, per_user + (1 if user_id <= extra else 0))
+        for movie_id in rng.sample(range(1, movies + 1), k):
+            yield {"user_id": user_id, "movie_id": movie_id, "score": rng.choices((1, 2, 3, 4, 5), (1, 2, 4, 5, 3))[0]}
+
+
+def comment_rows(rng: random.Random, users: int, movies: int, count: int):
+    started = datetime.utcnow() - timedelta(days=365)
+    for i in range(count):
+        yield {
+            "user_id": rng.randint(1, users),
+            # Quelques films très commentés (pagination des commentaires), beaucoup peu commentés
+            "movie_id": min(movies, int(rng.paretovariate(1.2))) if rng.random() < 0.3 else rng.randint(1, movies),
+            "content": " ".join(rng.choices(COMMENT_WORDS, k=rng.randint(5, 30))).capitalize() + ".",
+            "created_at": started + timedelta(seconds=i * 60),
+        }
+
+
+def seed(movies: int, users: int, ratings: int, comments: int, random_seed: int = 42) -> dict:
+    """Créer le schéma puis insérer le catalogue ; retourne les durées par table"""
+    rng = random.Random(random_seed)
+    prepare_database(engine)
+
+    timings = {}
+    for name, model, rows in [
+        ("movies", Movie, movie_rows(rng, movies)),
+        ("users", User, user_rows(users)),
+        ("ratings", Rating, rating_rows(rng, users, movies, ratings)),
+        ("comments", Comment, comment_rows(rng, users, movies, comments)),
+    ]:
+        started = time.perf_counter()
+        count = _insert(model, rows)
+        timings[name] = round(time.perf_counter() - started, 1)
+        print(f"   {name}: {count} lignes en {timings[name]} s")
+
+    # Index des genres construit en une passe depuis movies.genres
+    started = time.perf_counter()
+    GenreService.rebuild(engine)
+    timings["genres"] = round(time.perf_counter() - started, 1)
+    print(f"   genres: index reconstruit en {timings['genres']} s")
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Générer un catalogue synthétique (base vide attendue)")
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--ratings", type=int, default=1_000_000)
+    parser.add_argument("--comments", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42, help="Graine du générateur")
+    args = parser.parse_args(argv)
+
+    if args.users < 1 or args.movies < 1:
+        parser.error("--users et --movies doivent être positifs")
+
+    print(f"🌱 Génération : {args.movies} films, {args.users} utilisateurs, "
+          f"{args.ratings} notes, {args.comments} commentaires")
+    seed(args.movies, args.users, args.ratings, args.comments, args.seed)
+    print("✅ Catalogue prêt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Données partagées par benchmarks.seed (génération) et benchmarks.run (requêtes)
+Sans import de backend : le runner ne doit pas ouvrir de moteur de base.
+"""
+
+BENCH_PASSWORD = "benchmark"
+
+# Vocabulaire des titres : les scénarios de recherche piochent dans la même liste
+TITLE_WORDS = [
+    "dark", "night", "love", "war", "star", "city", "river", "king", "ghost", "summer",
+    "winter", "blood", "silent", "last", "golden", "lost", "wild", "iron", "broken", "secret",
+    "storm", "shadow", "empire", "dream", "fire", "ocean", "black", "white", "road", "island",
+    "queen", "stranger", "echo", "hunter", "memory", "planet", "garden", "machine", "desert", "heart",
+]
+GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama",
+    "Fantasy", "Horror", "Mystery", "Romance", "Sci-Fi", "Thriller", "War", "Western",
+]
+COMMENT_WORDS = [
+    "great", "boring", "masterpiece", "acting", "plot", "soundtrack", "ending", "twist",
+    "visuals", "slow", "brilliant", "overrated", "classic", "funny", "dark", "moving",
+]